@@ -8,17 +8,30 @@ DETECTION_INTERVAL = 1.0  # seconds between classifications in return mode
 INITIAL_WAIT_BEFORE_DETECTION = 3.0  # seconds to wait after entering return mode
 SAFETY_WAIT_AFTER_DETECTION = 2.0  # seconds after successful detection before picking
 STABLE_DETECTION_COUNT = 3  # Number of consecutive detections required
+INFERENCE_HALF = True  # Run the classifier in FP16 where supported (CUDA); ignored on CPU
+USE_OPENVINO = False  # Export the .pt model to OpenVINO IR once and run that on the CPU (needs openvino)
+OPENVINO_INT8 = False  # Quantize the OpenVINO export to INT8 (needs nncf and calibration data)
+OPENVINO_INT8_DATA = 'datasets/office_items'  # Classification dataset (~300 captured frames) for calibration/validation
+OPENVINO_INT8_MAX_DROP = 0.02  # Reject the INT8 model if its top-1 accuracy is this much below FP16
 
 # Movement Parameters
 SPEED_NORMAL = 1000
 SPEED_SLOW = 500
 SPEED_FAST = 1500
+SERVO_POSITION_TOLERANCE = 2  # degrees; a joint within this of its target counts as reached
+SERVO_POLL_INTERVAL = 0.02  # seconds between servo position reads while waiting on a move
+SERVO_DEG_PER_MS = 0.3  # nominal servo travel rate, used when position feedback is unavailable
+SERIAL_MIN_PACKET_INTERVAL = 0.020  # seconds; the controller firmware drops commands sent closer together
+RECOVERY_TIMEOUT = 5.0  # seconds to wait for the safe-position move after a failed borrow/return
+I2C_BUS_CLOCK_PATH = '/sys/class/i2c-adapter/i2c-1/of_node/clock-frequency'  # Arm_Lib uses bus 1
+I2C_RECOMMENDED_CLOCK_HZ = 400000
 
 # Camera Settings
 CAMERA_ID = 1
 CAMERA_WIDTH = 416  # Match model training size
 CAMERA_HEIGHT = 416
 CROP_PERCENTAGE = 0.70
+USE_OPENCL = False  # GPU (OpenCL T-API, or CUDA for the return preview) resize paths when available (dev machines; not the Pi)
 
 # Item Classes
 ITEM_CLASSES = [
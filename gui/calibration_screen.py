@@ -439,6 +439,7 @@ class CalibrationScreen:
         for name, var in self.gripper_sliders.items():
             self.positions.set_position(name, var.get())
         
+        # Explicit save: always write, even if nothing is marked dirty
         if self.positions.save_positions():
             messagebox.showinfo(
                 "Saved",
@@ -493,6 +494,10 @@ class CalibrationScreen:
         
         # Clear camera display
         self.camera_display.config(image='')
+        
+        # The feed runs on the Tk thread, so nothing is capturing now
+        if self.vision is not None:
+            self.vision.release_camera()
         self.logger.info("Camera feed stopped")
     
     def update_camera_feed(self):
@@ -503,15 +508,20 @@ class CalibrationScreen:
         try:
             frame = self.vision.get_live_feed()
             if frame is not None:
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                # Resize to exact display size in OpenCV (INTER_AREA is cheap
+                # for downscaling, unlike PIL's LANCZOS) before converting
+                resized = cv2.resize(
+                    frame,
+                    (self.camera_width, self.camera_height),
+                    interpolation=cv2.INTER_AREA
+                )
+                
+                # Convert BGR to RGB on the smaller image
+                frame_rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
                 
                 # Convert to PIL Image
                 pil_image = Image.fromarray(frame_rgb)
                 
-                # Resize to exact display size (maintains aspect ratio within bounds)
-                pil_image = pil_image.resize((self.camera_width, self.camera_height), Image.Resampling.LANCZOS)
-                
                 # Convert to PhotoImage
                 photo = ImageTk.PhotoImage(pil_image)
                 
@@ -5,19 +5,22 @@ Return screen - elegant design with live camera feed and detection
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
+import queue
 import time
-import cv2
-from PIL import Image, ImageTk
+import numpy as np
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from config.settings import (
+    CAMERA_WIDTH,
+    CAMERA_HEIGHT,
     DETECTION_INTERVAL,
     INITIAL_WAIT_BEFORE_DETECTION,
     SAFETY_WAIT_AFTER_DETECTION,
     STABLE_DETECTION_COUNT,
-    CONFIDENCE_THRESHOLD
+    CONFIDENCE_THRESHOLD,
+    USE_OPENCL
 )
 from utils.logger import RobotLogger
 
@@ -57,9 +60,30 @@ class ReturnScreen:
         
         self.return_mode_active = False
         self.detection_thread = None
+        self.capture_thread = None
         self.operation_in_progress = False
         self.is_active = True
         
+        # Single preallocated frame written by the capture thread; preview and
+        # detection copy out of it under the lock into their own reusable buffers
+        self._frame_lock = threading.Lock()
+        self._frame_shared = np.empty((CAMERA_HEIGHT, CAMERA_WIDTH, 3), dtype=np.uint8)
+        self._frame_seq = 0
+        self._preview_seq = 0
+        self._preview_buf = None
+        self._detect_buf = None
+        self._preview_backend = None  # 'cuda', 'opencl' or 'cpu', chosen on first frame
+        
+        # Latest-frame-only signal from the capture thread to the detection thread
+        self._frame_queue = queue.Queue(maxsize=1)
+        
+        # Cleared while the robot performs a return: capture and detection block on it
+        self._capture_enabled = threading.Event()
+        self._capture_enabled.set()
+        
+        # Set when return mode stops, to interrupt the safety wait immediately
+        self._stop_event = threading.Event()
+        
         self.create_ui()
         self.start_return_mode()
     
@@ -162,10 +186,18 @@ class ReturnScreen:
         status_content = tk.Frame(status_panel, bg=COLORS['card_bg'])
         status_content.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
         
+        # Text for the status panel lives in StringVars so updates are a single .set()
+        self.status_icon_var = tk.StringVar(value="🔄")
+        self.status_message_var = tk.StringVar(value="Initializing...")
+        self.detected_var = tk.StringVar()
+        self.confidence_var = tk.StringVar()
+        self.validation_var = tk.StringVar()
+        self._label_fg = {}
+        
         # Main status message
         self.status_icon = tk.Label(
             status_content,
-            text="🔄",
+            textvariable=self.status_icon_var,
             font=('Arial', 36),
             bg=COLORS['card_bg']
         )
@@ -173,7 +205,7 @@ class ReturnScreen:
         
         self.status_message = tk.Label(
             status_content,
-            text="Initializing...",
+            textvariable=self.status_message_var,
             font=('Arial', 13, 'bold'),
             bg=COLORS['card_bg'],
             fg=COLORS['text_white'],
@@ -188,7 +220,7 @@ class ReturnScreen:
         
         self.detected_label = tk.Label(
             self.detected_frame,
-            text="",
+            textvariable=self.detected_var,
             font=('Arial', 14, 'bold'),
             bg=COLORS['bg_medium'],
             fg=COLORS['accent_green'],
@@ -198,7 +230,7 @@ class ReturnScreen:
         
         self.confidence_label = tk.Label(
             self.detected_frame,
-            text="",
+            textvariable=self.confidence_var,
             font=('Arial', 11),
             bg=COLORS['bg_medium'],
             fg=COLORS['text_gray']
@@ -208,7 +240,7 @@ class ReturnScreen:
         # Validation status
         self.validation_label = tk.Label(
             status_content,
-            text="",
+            textvariable=self.validation_var,
             font=('Arial', 11, 'bold'),
             bg=COLORS['card_bg'],
             fg=COLORS['accent_green']
@@ -246,8 +278,8 @@ class ReturnScreen:
                 return
             
             try:
-                self.status_message.config(text="Moving robot to\nobservation position...")
-                self.status_icon.config(text="🤖")
+                self.status_message_var.set("Moving robot to\nobservation position...")
+                self.status_icon_var.set("🤖")
             except tk.TclError:
                 return
             
@@ -279,10 +311,8 @@ class ReturnScreen:
     def _update_countdown(self, remaining):
         """Update countdown display"""
         try:
-            self.status_icon.config(text="⏳")
-            self.status_message.config(
-                text=f"Place item in drop zone\n\nStarting detection in {remaining}s"
-            )
+            self.status_icon_var.set("⏳")
+            self.status_message_var.set(f"Place item in drop zone\n\nStarting detection in {remaining}s")
         except tk.TclError:
             pass
     
@@ -291,11 +321,17 @@ class ReturnScreen:
         self.return_mode_active = True
         
         try:
-            self.status_icon.config(text="👁️")
-            self.status_message.config(text="Watching for items...")
+            self.status_icon_var.set("👁️")
+            self.status_message_var.set("Watching for items...")
         except tk.TclError:
             pass
         
+        self.capture_thread = threading.Thread(
+            target=self.capture_loop,
+            daemon=True
+        )
+        self.capture_thread.start()
+        
         self.detection_thread = threading.Thread(
             target=self.continuous_detection_loop,
             daemon=True
@@ -304,6 +340,47 @@ class ReturnScreen:
         
         self.update_camera_feed()
     
+    def capture_loop(self):
+        """Background camera reader - sole consumer of the camera in return mode"""
+        while self.return_mode_active and self.is_active:
+            try:
+                self._capture_enabled.wait()
+                if not self.is_active:
+                    break
+                
+                frame = self.vision.get_live_feed()
+                if frame is None:
+                    time.sleep(0.1)
+                    continue
+                
+                with self._frame_lock:
+                    if self._frame_shared.shape != frame.shape:
+                        self._frame_shared = np.empty_like(frame)
+                    np.copyto(self._frame_shared, frame)
+                    self._frame_seq += 1
+                    seq = self._frame_seq
+                
+                self._offer_frame(seq)
+            
+            except Exception as e:
+                self.logger.error(f"Capture loop error: {e}")
+                if not self.is_active:
+                    break
+                time.sleep(1)
+    
+    def _copy_shared_frame(self, local):
+        """Copy the shared frame into a reusable local buffer and return it"""
+        with self._frame_lock:
+            if local is None or local.shape != self._frame_shared.shape:
+                local = np.empty_like(self._frame_shared)
+            np.copyto(local, self._frame_shared)
+        return local
+    
+    def _get_latest_frame(self):
+        """Return the newest captured frame in the detection thread's own buffer"""
+        self._detect_buf = self._copy_shared_frame(self._detect_buf)
+        return self._detect_buf
+    
     def continuous_detection_loop(self):
         """Background detection loop"""
         detection_count = 0
@@ -311,14 +388,18 @@ class ReturnScreen:
         
         while self.return_mode_active and self.is_active:
             try:
-                if self.operation_in_progress:
-                    time.sleep(1)
-                    continue
+                self._capture_enabled.wait()
                 
                 if not self.is_active:
                     break
                 
-                result = self.vision.classify_item()
+                try:
+                    self._frame_queue.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                
+                frame = self._get_latest_frame()
+                result = self.vision.classify_item(frame)
                 
                 if self.is_active:
                     try:
@@ -337,13 +418,14 @@ class ReturnScreen:
                     
                     if detection_count >= STABLE_DETECTION_COUNT:
                         self.logger.info(f"Stable detection: {detected_class}")
+                        # Pause right away so no further frames are classified
+                        # before the return sequence starts on the Tk thread
+                        self._capture_enabled.clear()
                         self.parent.after(0, lambda: self.execute_return_sequence(detected_class))
                         
                         detection_count = 0
                         last_detected_item = None
-                        
-                        while self.operation_in_progress and self.return_mode_active and self.is_active:
-                            time.sleep(0.5)
+                        continue
                 else:
                     detection_count = 0
                     last_detected_item = None
@@ -361,12 +443,21 @@ class ReturnScreen:
         if not self.return_mode_active or not self.is_active:
             return
         
+        # Imported here so the heavy imaging libraries load only once the feed runs
+        import cv2
+        from PIL import Image, ImageTk
+        
         try:
-            frame = self.vision.get_live_feed()
-            if frame is not None:
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                pil_image = Image.fromarray(frame_rgb)
-                pil_image = pil_image.resize((self.camera_width, self.camera_height), Image.Resampling.LANCZOS)
+            # Only repaint when the capture thread has produced a new frame
+            if self._frame_seq != self._preview_seq:
+                self._preview_seq = self._frame_seq
+                self._preview_buf = self._copy_shared_frame(self._preview_buf)
+                frame = self._preview_buf
+                
+                small = self._prepare_preview(cv2, frame)
+                
+                # Wrap the contiguous uint8 buffer without another copy
+                pil_image = Image.frombuffer('RGB', (self.camera_width, self.camera_height), small, 'raw', 'RGB', 0, 1)
                 
                 photo = ImageTk.PhotoImage(pil_image)
                 self.camera_display.config(image=photo)
@@ -380,6 +471,59 @@ class ReturnScreen:
             except tk.TclError:
                 pass
     
+    def _prepare_preview(self, cv2, frame):
+        """
+        Downscale and convert a BGR frame to an RGB preview image
+        
+        Resizing happens first (area filter) so colour conversion runs on the
+        small image. With USE_OPENCL it uses CUDA or OpenCL when OpenCV has
+        them; otherwise (the default) the CPU. OpenCL itself is switched on
+        process-wide by VisionSystem, not here.
+        """
+        if self._preview_backend is None:
+            if USE_OPENCL and hasattr(cv2, 'cuda') and cv2.cuda.getCudaEnabledDeviceCount() > 0:
+                self._preview_backend = 'cuda'
+            elif USE_OPENCL and cv2.ocl.haveOpenCL():
+                self._preview_backend = 'opencl'
+            else:
+                self._preview_backend = 'cpu'
+            self.logger.debug(f"Preview preprocessing backend: {self._preview_backend}")
+        
+        size = (self.camera_width, self.camera_height)
+        
+        if self._preview_backend == 'cuda':
+            gpu = cv2.cuda_GpuMat()
+            gpu.upload(frame)
+            gpu = cv2.cuda.resize(gpu, size, interpolation=cv2.INTER_AREA)
+            gpu = cv2.cuda.cvtColor(gpu, cv2.COLOR_BGR2RGB)
+            return gpu.download()
+        
+        if self._preview_backend == 'opencl':
+            u = cv2.UMat(frame)
+            u = cv2.resize(u, size, interpolation=cv2.INTER_AREA)
+            u = cv2.cvtColor(u, cv2.COLOR_BGR2RGB)
+            return u.get()
+        
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+    
+    def _offer_frame(self, seq):
+        """Signal a new frame to the detection thread, dropping any stale signal"""
+        try:
+            self._frame_queue.put_nowait(seq)
+        except queue.Full:
+            try:
+                self._frame_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._frame_queue.put_nowait(seq)
+    
+    def _set_label_fg(self, label, color):
+        """Change a label's colour only when it differs from the last one set"""
+        if self._label_fg.get(label) != color:
+            label.config(fg=color)
+            self._label_fg[label] = color
+    
     def update_detection_status(self, result: dict):
         """Update detection panel"""
         if not self.is_active:
@@ -387,45 +531,36 @@ class ReturnScreen:
         
         try:
             if result.get('success', False):
-                self.status_icon.config(text="✅")
-                self.status_message.config(text="Item detected!", fg=COLORS['accent_green'])
-                self.detected_label.config(
-                    text=f"📦 {result['class_name']}",
-                    fg=COLORS['accent_green']
-                )
-                self.confidence_label.config(
-                    text=f"Confidence: {result['confidence']:.1%}"
-                )
-                self.validation_label.config(
-                    text="✓ Valid item - Processing...",
-                    fg=COLORS['accent_green']
-                )
+                self.status_icon_var.set("✅")
+                self.status_message_var.set("Item detected!")
+                self._set_label_fg(self.status_message, COLORS['accent_green'])
+                self.detected_var.set(f"📦 {result['class_name']}")
+                self._set_label_fg(self.detected_label, COLORS['accent_green'])
+                self.confidence_var.set(f"Confidence: {result['confidence']:.1%}")
+                self.validation_var.set("✓ Valid item - Processing...")
+                self._set_label_fg(self.validation_label, COLORS['accent_green'])
             elif 'error' in result:
-                self.status_icon.config(text="👁️")
-                self.status_message.config(text="Watching for items...", fg=COLORS['text_white'])
+                self.status_icon_var.set("👁️")
+                self.status_message_var.set("Watching for items...")
+                self._set_label_fg(self.status_message, COLORS['text_white'])
                 
                 if result.get('class_name'):
-                    self.detected_label.config(
-                        text=f"📦 {result['class_name']}",
-                        fg=COLORS['accent_orange']
-                    )
-                    self.confidence_label.config(
-                        text=f"Confidence: {result.get('confidence', 0):.1%}"
-                    )
-                    self.validation_label.config(
-                        text=f"⚠ {result['error']}",
-                        fg=COLORS['accent_orange']
-                    )
+                    self.detected_var.set(f"📦 {result['class_name']}")
+                    self._set_label_fg(self.detected_label, COLORS['accent_orange'])
+                    self.confidence_var.set(f"Confidence: {result.get('confidence', 0):.1%}")
+                    self.validation_var.set(f"⚠ {result['error']}")
+                    self._set_label_fg(self.validation_label, COLORS['accent_orange'])
                 else:
-                    self.detected_label.config(text="")
-                    self.confidence_label.config(text="")
-                    self.validation_label.config(text="Place item in camera view")
+                    self.detected_var.set("")
+                    self.confidence_var.set("")
+                    self.validation_var.set("Place item in camera view")
             else:
-                self.status_icon.config(text="👁️")
-                self.status_message.config(text="Watching for items...", fg=COLORS['text_white'])
-                self.detected_label.config(text="")
-                self.confidence_label.config(text="")
-                self.validation_label.config(text="")
+                self.status_icon_var.set("👁️")
+                self.status_message_var.set("Watching for items...")
+                self._set_label_fg(self.status_message, COLORS['text_white'])
+                self.detected_var.set("")
+                self.confidence_var.set("")
+                self.validation_var.set("")
         except tk.TclError:
             pass
     
@@ -435,18 +570,18 @@ class ReturnScreen:
             return
         
         self.operation_in_progress = True
+        self._capture_enabled.clear()
         
         try:
-            self.status_icon.config(text="⏳")
-            self.status_message.config(text=f"Processing...\n\nSafety wait: {SAFETY_WAIT_AFTER_DETECTION}s")
+            self.status_icon_var.set("⏳")
+            self.status_message_var.set(f"Processing...\n\nSafety wait: {SAFETY_WAIT_AFTER_DETECTION}s")
         except tk.TclError:
             pass
         
         def return_thread():
-            for _ in range(int(SAFETY_WAIT_AFTER_DETECTION * 10)):
-                if not self.is_active:
-                    return
-                time.sleep(0.1)
+            # Single wait that stop_return_mode() can cut short
+            if self._stop_event.wait(SAFETY_WAIT_AFTER_DETECTION):
+                return
             
             if not self.is_active:
                 return
@@ -454,7 +589,7 @@ class ReturnScreen:
             try:
                 self.parent.after(0, lambda: self.progress_label.config(text=f"Returning {item_name}...") if self.is_active else None)
                 self.parent.after(0, lambda: self.progress_bar.start() if self.is_active else None)
-                self.parent.after(0, lambda: self.status_icon.config(text="🤖") if self.is_active else None)
+                self.parent.after(0, lambda: self.status_icon_var.set("🤖") if self.is_active else None)
             except tk.TclError:
                 return
             
@@ -478,26 +613,22 @@ class ReturnScreen:
             pass
         
         self.operation_in_progress = False
+        self._resume_capture()
         
         if result.get('success', False):
             self.state.mark_available(item_name)
             
             try:
-                self.status_icon.config(text="✅")
-                self.status_message.config(
-                    text=f"✓ {item_name}\nreturned successfully!",
-                    fg=COLORS['accent_green']
-                )
-                self.detected_label.config(text="")
-                self.confidence_label.config(text="")
-                self.validation_label.config(text="Waiting for next item...")
+                self.status_icon_var.set("✅")
+                self.status_message_var.set(f"✓ {item_name}\nreturned successfully!")
+                self._set_label_fg(self.status_message, COLORS['accent_green'])
+                self.detected_var.set("")
+                self.confidence_var.set("")
+                self.validation_var.set("Waiting for next item...")
             except tk.TclError:
                 pass
             
-            messagebox.showinfo(
-                "✓ Return Complete",
-                f"{item_name} has been returned to storage."
-            )
+            self._show_toast(f"✓ {item_name} has been returned to storage.")
             
             # Reset status after a moment
             try:
@@ -507,26 +638,68 @@ class ReturnScreen:
         else:
             error_msg = result.get('message', 'Unknown error')
             try:
-                self.status_icon.config(text="❌")
-                self.status_message.config(
-                    text=f"Return failed\n\n{error_msg}",
-                    fg=COLORS['accent_red']
-                )
+                self.status_icon_var.set("❌")
+                self.status_message_var.set(f"Return failed\n\n{error_msg}")
+                self._set_label_fg(self.status_message, COLORS['accent_red'])
             except tk.TclError:
                 pass
             
-            messagebox.showerror(
-                "Return Failed",
-                f"Could not return {item_name}:\n\n{error_msg}"
+            self._show_toast(
+                f"Could not return {item_name}:\n\n{error_msg}",
+                ms=5000,
+                bg=COLORS['accent_red']
             )
     
+    def _show_toast(self, text: str, ms: int = 2500, bg: str = COLORS['accent_green']):
+        """
+        Show an auto-dismissing notification over the screen
+        
+        Unlike messagebox dialogs this does not block the Tk event loop,
+        so the camera feed keeps updating while the message is visible.
+        """
+        try:
+            toast = tk.Toplevel(self.frame)
+            toast.overrideredirect(True)
+            toast.configure(bg=bg)
+            
+            tk.Label(
+                toast,
+                text=text,
+                font=('Arial', 12, 'bold'),
+                bg=bg,
+                fg=COLORS['text_white'],
+                wraplength=360,
+                justify=tk.CENTER,
+                padx=25,
+                pady=15
+            ).pack()
+            
+            # Centre over the return screen
+            toast.update_idletasks()
+            x = self.frame.winfo_rootx() + (self.frame.winfo_width() - toast.winfo_reqwidth()) // 2
+            y = self.frame.winfo_rooty() + (self.frame.winfo_height() - toast.winfo_reqheight()) // 2
+            toast.geometry(f"+{x}+{y}")
+            
+            toast.after(ms, toast.destroy)
+        except tk.TclError:
+            pass
+    
+    def _resume_capture(self):
+        """Discard the pre-return frame signal and restart capture/detection"""
+        try:
+            self._frame_queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._capture_enabled.set()
+    
     def _reset_status(self):
         """Reset status display for next item"""
         if not self.is_active:
             return
         try:
-            self.status_icon.config(text="👁️")
-            self.status_message.config(text="Watching for items...", fg=COLORS['text_white'])
+            self.status_icon_var.set("👁️")
+            self.status_message_var.set("Watching for items...")
+            self._set_label_fg(self.status_message, COLORS['text_white'])
         except tk.TclError:
             pass
     
@@ -537,9 +710,16 @@ class ReturnScreen:
         self.return_mode_active = False
         self.operation_in_progress = False
         
+        # Wake waiting threads so they can observe is_active and exit
+        self._stop_event.set()
+        self._capture_enabled.set()
+        
         if self.detection_thread and self.detection_thread.is_alive():
             self.detection_thread.join(timeout=1)
         
+        if self.capture_thread and self.capture_thread.is_alive():
+            self.capture_thread.join(timeout=1)
+        
         def move_home():
             try:
                 self.robot.move_home()
@@ -548,6 +728,10 @@ class ReturnScreen:
         
         thread = threading.Thread(target=move_home, daemon=True)
         thread.start()
+        
+        # Free the camera (and stop its reader) off the Tk thread
+        if self.vision is not None:
+            threading.Thread(target=self.vision.release_camera, daemon=True).start()
     
     def handle_back(self):
         """Handle back button"""
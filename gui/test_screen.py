@@ -5,11 +5,11 @@ Test screen for testing operations
 import tkinter as tk
 from tkinter import ttk, messagebox, Toplevel
 import threading
+import time
+from collections import deque
+from functools import partial, wraps
+from typing import Optional
 import cv2
-from PIL import Image, ImageTk
-import sys
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent))
 
 from config.settings import (
     THEME_COLOR_PRIMARY,
@@ -22,6 +22,21 @@ from config.settings import (
 from utils.logger import RobotLogger
 
 
+# How long a connection check result is reused
+CONNECTION_CACHE_TTL = 0.5
+
+
+def requires_robot(method):
+    """Run a test method only if the robot is connected, else show an error"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self._is_connected_cached():
+            messagebox.showerror("Error", "Robot not connected")
+            return None
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
 class TestScreen:
     """
     Test operations interface
@@ -41,8 +56,91 @@ class TestScreen:
         
         self.camera_window = None
         self.camera_active = False
+        self._preview_size = None
+        self._display_photo = None
+        
+        # Camera frames are read on their own thread; the UI takes the latest
+        # when the thread bumps _frame_counter. The Tk thread never joins it
+        # (that thread's after() call waits on the mainloop); the camera is
+        # released from _release_thread instead
+        self._cap_thread = None
+        self._cap_stop = None
+        self._release_thread = None
+        self._latest_frame = None
+        self._frame_counter = None
+        self._repaint_pending = False
+        
+        # Classification runs on a worker thread at its own, slower cadence
+        self._classify_busy = False
+        self._last_classify_t = 0.0
+        self._pending_frames = deque(maxlen=4)
+        
+        # (checked_at, connected) from the last robot connection check
+        self._conn_cache = (0.0, False)
+        
+        # Progress messages from the test thread are coalesced
+        self._pending_status = None
+        self._status_flush_scheduled = False
         
         self.create_ui()
+        self.create_progress_window()
+    
+    def create_progress_window(self):
+        """Build the test progress window once; it is shown/hidden per test"""
+        self._progress_window = Toplevel(self.parent)
+        self._progress_window.withdraw()
+        self._progress_window.geometry("400x150")
+        self._progress_window.configure(bg=THEME_COLOR_PRIMARY)
+        self._progress_window.transient(self.parent)
+        # Closing only hides it so the window survives for the next test
+        self._progress_window.protocol("WM_DELETE_WINDOW", self._hide_progress)
+        
+        self._progress_label = tk.Label(
+            self._progress_window,
+            text="",
+            font=('Arial', 12),
+            bg=THEME_COLOR_PRIMARY,
+            fg=THEME_COLOR_TEXT_LIGHT,
+            wraplength=350
+        )
+        self._progress_label.pack(pady=20)
+        
+        self._progress_bar = ttk.Progressbar(
+            self._progress_window,
+            mode='indeterminate',
+            length=300
+        )
+        self._progress_bar.pack(pady=10)
+    
+    def _show_progress(self, title: str, text: str):
+        """Show the shared progress window"""
+        self._progress_window.title(title)
+        self._progress_label.config(text=text)
+        self._progress_window.deiconify()
+        self._progress_window.lift()
+        self._progress_window.grab_set()
+        self._progress_bar.start(10)
+    
+    def _flush_pending_status(self):
+        """Apply the latest queued progress message (runs on the Tk thread)"""
+        self._status_flush_scheduled = False
+        msg = self._pending_status
+        if msg is None or self._progress_window is None:
+            return
+        self._pending_status = None
+        try:
+            self._progress_label.config(text=msg)
+        except tk.TclError:
+            pass
+    
+    def _hide_progress(self):
+        """Hide the shared progress window"""
+        try:
+            self._progress_bar.stop()
+            self._progress_window.grab_release()
+            self._progress_window.withdraw()
+        except tk.TclError:
+            pass
     
     def create_ui(self):
         """Create test screen UI"""
@@ -73,15 +171,67 @@ class TestScreen:
         )
         title.pack(side=tk.LEFT, padx=20)
         
+        # Inline confirm bar (hidden until a test is requested)
+        self._confirm_frame = tk.Frame(self.frame, bg=THEME_COLOR_SECONDARY)
+        self._pending_test = None
+        
+        self._confirm_label = tk.Label(
+            self._confirm_frame,
+            text="",
+            font=('Arial', 12),
+            bg=THEME_COLOR_SECONDARY,
+            fg=THEME_COLOR_TEXT_LIGHT,
+            justify=tk.LEFT,
+            anchor=tk.W
+        )
+        self._confirm_label.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=15, pady=10)
+        
+        cancel_btn = tk.Button(
+            self._confirm_frame,
+            text="Cancel",
+            command=self._hide_confirm,
+            font=('Arial', 11, 'bold'),
+            bg='#E74C3C',
+            fg=THEME_COLOR_TEXT_LIGHT,
+            relief='flat',
+            padx=15,
+            pady=6,
+            cursor='hand2'
+        )
+        cancel_btn.pack(side=tk.RIGHT, padx=(5, 15), pady=10)
+        
+        confirm_btn = tk.Button(
+            self._confirm_frame,
+            text="Confirm",
+            command=self._confirm_test,
+            font=('Arial', 11, 'bold'),
+            bg=THEME_COLOR_SUCCESS,
+            fg=THEME_COLOR_TEXT_LIGHT,
+            relief='flat',
+            padx=15,
+            pady=6,
+            cursor='hand2'
+        )
+        confirm_btn.pack(side=tk.RIGHT, padx=5, pady=10)
+        
         # Scrollable content
         canvas = tk.Canvas(self.frame, bg=THEME_COLOR_PRIMARY, highlightthickness=0)
+        self._content_canvas = canvas
         scrollbar = tk.Scrollbar(self.frame, orient=tk.VERTICAL, command=canvas.yview)
         scrollable_frame = tk.Frame(canvas, bg=THEME_COLOR_PRIMARY)
         
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
+        # Coalesce bursts of <Configure> events into one bbox walk per idle pass
+        pending_scroll = [None]
+        
+        def update_scrollregion():
+            pending_scroll[0] = None
+            canvas.configure(scrollregion=canvas.bbox("all"))
+        
+        def on_frame_configure(event):
+            if pending_scroll[0] is None:
+                pending_scroll[0] = canvas.after_idle(update_scrollregion)
+        
+        scrollable_frame.bind("<Configure>", on_frame_configure)
         
         canvas.create_window((0, 0), window=scrollable_frame, anchor=tk.NW)
         canvas.configure(yscrollcommand=scrollbar.set)
@@ -196,7 +346,7 @@ class TestScreen:
         wrist_mid_btn = tk.Button(
             servo_frame,
             text="Wrist 90° (S5)",
-            command=lambda: self.test_wrist(90),
+            command=partial(self.test_wrist, 90),
             font=('Arial', 11, 'bold'),
             bg=THEME_COLOR_ACCENT,
             fg=THEME_COLOR_TEXT_LIGHT,
@@ -210,7 +360,7 @@ class TestScreen:
         wrist_left_btn = tk.Button(
             servo_frame,
             text="Wrist 0° (S5)",
-            command=lambda: self.test_wrist(0),
+            command=partial(self.test_wrist, 0),
             font=('Arial', 11, 'bold'),
             bg=THEME_COLOR_ACCENT,
             fg=THEME_COLOR_TEXT_LIGHT,
@@ -224,7 +374,7 @@ class TestScreen:
         wrist_right_btn = tk.Button(
             servo_frame,
             text="Wrist 180° (S5)",
-            command=lambda: self.test_wrist(180),
+            command=partial(self.test_wrist, 180),
             font=('Arial', 11, 'bold'),
             bg=THEME_COLOR_ACCENT,
             fg=THEME_COLOR_TEXT_LIGHT,
@@ -236,94 +386,88 @@ class TestScreen:
         wrist_right_btn.pack(side=tk.LEFT, padx=5)
     
     def create_item_buttons(self, parent, operation):
-        """Create grid of item test buttons"""
-        row = 0
-        col = 0
-        
+        """Create item list with one shared test button for the section"""
+        # A single Treeview lists every item; one button acts on the
+        # selection instead of a Frame/Label/Button card per item
+        item_list = ttk.Treeview(
+            parent,
+            columns=('item',),
+            show='',
+            selectmode='browse',
+            height=min(len(ITEM_CLASSES), 8)
+        )
+        item_list.column('item', anchor=tk.W)
         for item_name in ITEM_CLASSES:
-            card = tk.Frame(parent, bg=THEME_COLOR_SECONDARY, relief='raised', bd=2)
-            card.grid(row=row, column=col, padx=5, pady=5, sticky='ew')
-            
-            # Item name
-            name_label = tk.Label(
-                card,
-                text=item_name,
-                font=('Arial', 11, 'bold'),
-                bg=THEME_COLOR_SECONDARY,
-                fg=THEME_COLOR_TEXT_LIGHT,
-                wraplength=150
-            )
-            name_label.pack(pady=(10, 5))
-            
-            # Test button
-            btn_text = f"Test {operation.capitalize()}"
-            btn = tk.Button(
-                card,
-                text=btn_text,
-                command=lambda item=item_name, op=operation: self.test_operation(item, op),
-                font=('Arial', 10, 'bold'),
-                bg=THEME_COLOR_ACCENT,
-                fg=THEME_COLOR_TEXT_LIGHT,
-                relief='flat',
-                padx=15,
-                pady=8,
-                cursor='hand2'
-            )
-            btn.pack(pady=(0, 10))
-            
-            col += 1
-            if col >= 3:
-                col = 0
-                row += 1
-        
-        # Configure grid weights
-        for i in range(3):
-            parent.columnconfigure(i, weight=1)
+            item_list.insert('', tk.END, iid=item_name, values=(item_name,))
+        if ITEM_CLASSES:
+            item_list.selection_set(ITEM_CLASSES[0])
+        item_list.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        
+        def test_selected(event=None):
+            selection = item_list.selection()
+            if not selection:
+                messagebox.showwarning("No Item", "Select an item to test")
+                return
+            self.test_operation(selection[0], operation)
+        
+        item_list.bind('<Double-1>', test_selected)
+        
+        btn = tk.Button(
+            parent,
+            text=f"Test {operation.capitalize()}",
+            command=test_selected,
+            font=('Arial', 10, 'bold'),
+            bg=THEME_COLOR_ACCENT,
+            fg=THEME_COLOR_TEXT_LIGHT,
+            relief='flat',
+            padx=15,
+            pady=8,
+            cursor='hand2'
+        )
+        btn.pack(side=tk.LEFT, padx=5, anchor=tk.N)
     
+    @requires_robot
     def test_operation(self, item_name: str, operation: str):
         """Test borrow or return operation"""
-        if not self.robot.is_connected():
-            messagebox.showerror("Error", "Robot not connected")
-            return
-        
-        result = messagebox.askyesno(
-            f"Test {operation.capitalize()}",
-            f"Test {operation} operation for {item_name}?\n\nNote: This does NOT update state."
-        )
-        
-        if not result:
-            return
-        
-        # Create progress window
-        progress_window = Toplevel(self.parent)
-        progress_window.title(f"Testing {operation.capitalize()}")
-        progress_window.geometry("400x150")
-        progress_window.configure(bg=THEME_COLOR_PRIMARY)
-        progress_window.transient(self.parent)
-        progress_window.grab_set()
-        
-        status_label = tk.Label(
-            progress_window,
-            text=f"Testing {operation} for {item_name}...",
-            font=('Arial', 12),
-            bg=THEME_COLOR_PRIMARY,
-            fg=THEME_COLOR_TEXT_LIGHT,
-            wraplength=350
+        # Ask inline instead of through a modal dialog
+        self._pending_test = (item_name, operation)
+        self._confirm_label.config(
+            text=f"Test {operation} operation for {item_name}?  (This does NOT update state.)"
         )
-        status_label.pack(pady=20)
-        
-        progress_bar = ttk.Progressbar(
-            progress_window,
-            mode='indeterminate',
-            length=300
+        if not self._confirm_frame.winfo_ismapped():
+            self._confirm_frame.pack(fill=tk.X, pady=(0, 10), before=self._content_canvas)
+    
+    def _hide_confirm(self):
+        """Hide the inline confirm bar"""
+        self._pending_test = None
+        self._confirm_frame.pack_forget()
+    
+    def _confirm_test(self):
+        """Run the test that the confirm bar is asking about"""
+        pending = self._pending_test
+        self._hide_confirm()
+        if pending is not None:
+            self._run_test_operation(*pending)
+    
+    def _run_test_operation(self, item_name: str, operation: str):
+        """Run a confirmed borrow/return test with a progress window"""
+        self._show_progress(
+            f"Testing {operation.capitalize()}",
+            f"Testing {operation} for {item_name}..."
         )
-        progress_bar.pack(pady=10)
-        progress_bar.start(10)
+        progress_window = self._progress_window
         
         # Run test in background
         def test_thread():
             def update_status(msg):
-                status_label.config(text=msg)
+                # Keep only the newest message; one label update per idle pass
+                self._pending_status = msg
+                if not self._status_flush_scheduled:
+                    self._status_flush_scheduled = True
+                    try:
+                        progress_window.after_idle(self._flush_pending_status)
+                    except (tk.TclError, RuntimeError):
+                        self._status_flush_scheduled = False
             
             try:
                 if operation == "borrow":
@@ -332,23 +476,23 @@ class TestScreen:
                     result = self.robot.return_item(item_name, status_callback=update_status)
                 
                 # Close progress window
-                progress_window.after(0, progress_window.destroy)
+                progress_window.after(0, self._hide_progress)
                 
                 # Show result
                 if result.get('success', False):
-                    self.parent.after(0, lambda: self.show_test_result(
+                    self.parent.after(0, self.show_test_result,
                         True,
                         f"{operation.capitalize()} test completed successfully for {item_name}"
-                    ))
+                    )
                 else:
-                    self.parent.after(0, lambda: self.show_test_result(
+                    self.parent.after(0, self.show_test_result,
                         False,
                         f"{operation.capitalize()} test failed:\n{result.get('message', 'Unknown error')}"
-                    ))
+                    )
             
             except Exception as e:
-                progress_window.after(0, progress_window.destroy)
-                self.parent.after(0, lambda: self.show_test_result(False, str(e)))
+                progress_window.after(0, self._hide_progress)
+                self.parent.after(0, self.show_test_result, False, str(e))
         
         thread = threading.Thread(target=test_thread, daemon=True)
         thread.start()
@@ -359,6 +503,11 @@ class TestScreen:
             messagebox.showwarning("Already Active", "Camera test is already running")
             return
         
+        # The previous window's camera is still being released; retry shortly
+        if self._release_thread is not None and self._release_thread.is_alive():
+            self.parent.after(100, self.test_camera)
+            return
+        
         self.camera_active = True
         
         # Create camera window
@@ -399,59 +548,205 @@ class TestScreen:
         )
         self.camera_results.pack(pady=10, padx=20)
         
-        # Start camera feed
+        # Preview size and the persistent Tk image are set up from the first frame
+        self._preview_size = None
+        self._display_photo = None
+        
+        # Start camera feed, then the capture thread that drives it
+        self._latest_frame = None
         self.update_camera_test(camera_label)
+        
+        self._cap_stop = threading.Event()
+        self._cap_thread = threading.Thread(target=self._capture_loop, args=(self._cap_stop,), daemon=True)
+        self._cap_thread.start()
     
     def update_camera_test(self, display_label):
-        """Update camera test window"""
+        """
+        Hook the preview up to the capture thread: each new frame bumps
+        _frame_counter and its write trace repaints, so nothing polls
+        """
         if not self.camera_active or self.camera_window is None:
             return
         
-        try:
-            # Capture and classify
-            frame = self.vision.capture_frame()
-            if frame is not None:
-                # Display frame
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                pil_image = Image.fromarray(frame_rgb)
-                pil_image.thumbnail((560, 420), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(pil_image)
-                display_label.config(image=photo)
-                display_label.image = photo
-                
-                # Classify
-                result = self.vision.classify_item(frame)
-                
-                # Update results
-                if result.get('success', False):
-                    text = f"✓ Detected: {result['class_name']}\n"
-                    text += f"Confidence: {result['confidence']:.1%}\n\n"
-                    text += "All predictions:\n"
-                    for cls, conf in result.get('all_predictions', {}).items():
-                        text += f"  {cls}: {conf:.1%}\n"
-                    self.camera_results.config(text=text, fg=THEME_COLOR_SUCCESS)
-                else:
-                    error = result.get('error', 'No detection')
-                    text = f"✗ {error}\n\n"
-                    if result.get('class_name'):
-                        text += f"Detected: {result['class_name']}\n"
-                        text += f"Confidence: {result.get('confidence', 0):.1%}"
-                    self.camera_results.config(text=text, fg='#F39C12')
+        # Bind everything the repaint touches once; it runs for every camera
+        # frame on the Tk thread, so avoid re-resolving attributes per frame
+        resize = cv2.resize
+        interpolation = cv2.INTER_LINEAR
+        cvt = cv2.cvtColor
+        bgr2rgb = cv2.COLOR_BGR2RGB
+        tkcall = display_label.tk.call
+        monotonic = time.monotonic
+        start_worker = self._start_classify_worker
+        pending = self._pending_frames
+        debug = self.logger.debug
+        
+        def _repaint(*_):
+            self._repaint_pending = False
+            if not self.camera_active:
+                return
+            
+            try:
+                frame = self._latest_frame
+                if frame is not None:
+                    if self._preview_size is None:
+                        self._setup_preview(display_label, frame.shape)
+                    
+                    # Display frame - resize, swap to RGB on the small image and
+                    # hand Tk a binary PPM directly (no PIL/ImageTk round trip)
+                    resized = resize(frame, self._preview_size, interpolation=interpolation)
+                    rgb = cvt(resized, bgr2rgb)
+                    photo = self._display_photo
+                    tkcall(photo.name, 'put', self._ppm_header + rgb.tobytes(), '-format', 'PPM')
+                    
+                    # Queue the frame; the classifier takes whatever has
+                    # stacked up as one batch, at most every 0.4 s
+                    pending.append(frame)
+                    now = monotonic()
+                    if not self._classify_busy and now - self._last_classify_t > 0.4:
+                        self._classify_busy = True
+                        self._last_classify_t = now
+                        frames = list(pending)
+                        pending.clear()
+                        start_worker(frames)
+            
+            except Exception as e:
+                debug(f"Camera test update error: {e}")
         
+        self._repaint_pending = False
+        self._frame_counter = tk.IntVar(master=self.camera_window, value=0)
+        self._frame_counter.trace_add('write', _repaint)
+    
+    def _bump_frame_counter(self):
+        """Signal a new frame to the Tk thread (runs on the Tk thread)"""
+        counter = self._frame_counter
+        if counter is None or not self.camera_active:
+            self._repaint_pending = False
+            return
+        try:
+            counter.set(counter.get() + 1)
+        except tk.TclError:
+            self._repaint_pending = False
+    
+    def _capture_loop(self, stop: threading.Event):
+        """Read camera frames until stop is set (the test window closes)"""
+        capture = self.vision.capture_frame
+        window = self.camera_window
+        bump = self._bump_frame_counter
+        while not stop.is_set():
+            frame = capture()
+            if frame is None:
+                stop.wait(0.05)
+                continue
+            # Plain attribute assignment swaps the reference atomically
+            self._latest_frame = frame
+            
+            # At most one repaint queued; the Tk side always takes the newest
+            if not self._repaint_pending:
+                self._repaint_pending = True
+                try:
+                    window.after(0, bump)
+                except (tk.TclError, RuntimeError):
+                    break
+    
+    def _start_classify_worker(self, frames):
+        """Run one batch classification in a background thread"""
+        threading.Thread(
+            target=self._classify_worker,
+            args=(frames,),
+            daemon=True
+        ).start()
+    
+    def _setup_preview(self, display_label, frame_shape):
+        """
+        Fix the preview size from the camera resolution (fits 560x420,
+        keeps aspect ratio, never upscales) and create the one persistent
+        Tk photo image that frames are written into
+        """
+        frame_h, frame_w = frame_shape[:2]
+        scale = min(560 / frame_w, 420 / frame_h, 1.0)
+        self._preview_size = (max(1, int(frame_w * scale)), max(1, int(frame_h * scale)))
+        
+        width, height = self._preview_size
+        self._display_photo = tk.PhotoImage(master=display_label, width=width, height=height)
+        self._ppm_header = f'P6\n{width} {height}\n255\n'.encode('ascii')
+        display_label.config(image=self._display_photo)
+    
+    def _classify_worker(self, frames):
+        """Background classification of the pending frames; keeps the newest result"""
+        try:
+            results = self.vision.classify_batch(frames, return_all=True)
+            result = results[-1] if results else {'success': False, 'error': 'No frames'}
         except Exception as e:
-            self.logger.debug(f"Camera test update error: {e}")
+            result = {'success': False, 'error': str(e)}
         
-        # Schedule next update
-        if self.camera_active:
-            self.camera_window.after(100, lambda: self.update_camera_test(display_label))
+        window = self.camera_window
+        try:
+            if self.camera_active and window is not None:
+                window.after(0, self._apply_classification, result)
+            else:
+                self._classify_busy = False
+        except (tk.TclError, RuntimeError):
+            self._classify_busy = False
+    
+    def _apply_classification(self, result: dict):
+        """Show classification result (runs on the Tk thread)"""
+        self._classify_busy = False
+        if not self.camera_active:
+            return
+        
+        try:
+            if result.get('success', False):
+                text = f"✓ Detected: {result['class_name']}\n"
+                text += f"Confidence: {result['confidence']:.1%}\n\n"
+                text += "All predictions:\n"
+                for cls, conf in result.get('all_predictions', {}).items():
+                    text += f"  {cls}: {conf:.1%}\n"
+                self.camera_results.config(text=text, fg=THEME_COLOR_SUCCESS)
+            else:
+                error = result.get('error', 'No detection')
+                text = f"✗ {error}\n\n"
+                if result.get('class_name'):
+                    text += f"Detected: {result['class_name']}\n"
+                    text += f"Confidence: {result.get('confidence', 0):.1%}"
+                self.camera_results.config(text=text, fg='#F39C12')
+        except tk.TclError:
+            pass
     
     def close_camera_window(self):
         """Close camera test window"""
+        was_active = self.camera_active
         self.camera_active = False
+        
+        if self._cap_stop is not None:
+            self._cap_stop.set()
+            self._cap_stop = None
+        
+        # The camera is released off the Tk thread, once the capture thread
+        # has finished its read, so closing the window never blocks the UI
+        cap_thread = self._cap_thread
+        self._cap_thread = None
+        if was_active:
+            self._release_thread = threading.Thread(
+                target=self._release_camera_after, args=(cap_thread,), daemon=True
+            )
+            self._release_thread.start()
+        
+        # Drop frame/image references the preview closures were holding
+        self._latest_frame = None
+        self._frame_counter = None
+        self._display_photo = None
+        self._pending_frames.clear()
+        
         if self.camera_window:
             self.camera_window.destroy()
             self.camera_window = None
     
+    def _release_camera_after(self, cap_thread: Optional[threading.Thread]):
+        """Wait for the capture thread to stop, then release the camera (background thread)"""
+        if cap_thread is not None:
+            cap_thread.join(timeout=1.0)
+        self.vision.release_camera()
+    
     def show_test_result(self, success: bool, message: str):
         """Display test result to user"""
         if success:
@@ -461,12 +756,9 @@ class TestScreen:
             messagebox.showerror("Test Failed", message)
             self.status_callback("Test failed")
     
+    @requires_robot
     def test_gripper_open(self):
         """Test opening the gripper (servo 6)"""
-        if not self.robot.is_connected():
-            messagebox.showerror("Error", "Robot not connected")
-            return
-        
         self.status_callback("Testing gripper open...")
         try:
             result = self.robot.open_gripper()
@@ -478,12 +770,9 @@ class TestScreen:
             messagebox.showerror("Error", f"Gripper test error: {e}")
         self.status_callback("Ready")
     
+    @requires_robot
     def test_gripper_close(self):
         """Test closing the gripper (servo 6)"""
-        if not self.robot.is_connected():
-            messagebox.showerror("Error", "Robot not connected")
-            return
-        
         self.status_callback("Testing gripper close...")
         try:
             result = self.robot.close_gripper()
@@ -495,12 +784,9 @@ class TestScreen:
             messagebox.showerror("Error", f"Gripper test error: {e}")
         self.status_callback("Ready")
     
+    @requires_robot
     def test_wrist(self, angle: int):
         """Test moving the wrist (servo 5) to specific angle"""
-        if not self.robot.is_connected():
-            messagebox.showerror("Error", "Robot not connected")
-            return
-        
         self.status_callback(f"Testing wrist to {angle}°...")
         try:
             result = self.robot.move_wrist(angle, speed=500)
@@ -512,6 +798,17 @@ class TestScreen:
             messagebox.showerror("Error", f"Wrist test error: {e}")
         self.status_callback("Ready")
     
+    def _is_connected_cached(self) -> bool:
+        """Robot connection status, reused for CONNECTION_CACHE_TTL seconds"""
+        now = time.monotonic()
+        checked_at, connected = self._conn_cache
+        if now - checked_at < CONNECTION_CACHE_TTL:
+            return connected
+        
+        connected = self.robot.is_connected()
+        self._conn_cache = (now, connected)
+        return connected
+    
     def handle_back(self):
         """Handle back button - cleanup and return to main menu"""
         self.cleanup()
@@ -521,3 +818,10 @@ class TestScreen:
         """Cleanup when leaving screen"""
         self.logger.info("Cleaning up test screen")
         self.close_camera_window()
+        
+        if self._progress_window is not None:
+            try:
+                self._progress_window.destroy()
+            except tk.TclError:
+                pass
+            self._progress_window = None
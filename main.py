@@ -7,13 +7,13 @@ a Yahboom Dofbot robot arm with computer vision.
 
 import tkinter as tk
 from tkinter import messagebox
+import importlib.util
 import os
-import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# Add project root to path
+# Project root (the script's own directory, already sys.path[0] when run)
 project_root = Path(__file__).parent
-sys.path.append(str(project_root))
 
 from utils.logger import RobotLogger
 from modules.vision_system import VisionSystem
@@ -61,11 +61,12 @@ def check_dependencies():
         'ultralytics': 'ultralytics'
     }
     
+    # find_spec only locates the package, it does not execute it, so
+    # probing ultralytics here does not drag in torch a second time
     for module, package in packages.items():
-        try:
-            __import__(module)
+        if importlib.util.find_spec(module) is not None:
             logger.info(f"✓ {package} available")
-        except ImportError:
+        else:
             error_msg = f"✗ {package} not installed"
             logger.error(error_msg)
             errors.append(f"Python package missing: {package}")
@@ -73,31 +74,42 @@ def check_dependencies():
     return errors, logger
 
 
+def load_vision_system(model_path):
+    """Load the vision system and warm the model up on the calling thread"""
+    vision_system = VisionSystem(str(model_path))
+    vision_system.warmup()
+    return vision_system
+
+
 def initialize_systems(logger):
     """Initialize all system components"""
     logger.info("\nInitializing systems...")
-    
-    # Initialize position manager
-    logger.info("Loading position configurations...")
-    position_manager = PositionManager()
-    
-    # Initialize state manager
-    logger.info("Initializing state manager...")
-    state_manager = StateManager()
-    
-    # Initialize robot controller
-    logger.info("Initializing robot controller...")
-    robot_controller = RobotController(position_manager)
-    
-    # Initialize vision system
-    logger.info("Initializing vision system...")
     model_path = project_root / 'models' / 'fine-tunedmodel.pt'
     
-    try:
-        vision_system = VisionSystem(str(model_path))
-    except Exception as e:
-        logger.error(f"Failed to initialize vision system: {e}")
-        vision_system = None
+    # Config loading and the model load are independent, so run them side by
+    # side; the YOLO load dominates and mostly waits on disk/torch
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        logger.info("Loading position configurations...")
+        fut_positions = executor.submit(PositionManager)
+        
+        logger.info("Initializing state manager...")
+        fut_state = executor.submit(StateManager)
+        
+        logger.info("Initializing vision system...")
+        fut_vision = executor.submit(load_vision_system, model_path)
+        
+        position_manager = fut_positions.result()
+        state_manager = fut_state.result()
+        
+        # Initialize robot controller (needs positions) while the model loads
+        logger.info("Initializing robot controller...")
+        robot_controller = RobotController(position_manager)
+        
+        try:
+            vision_system = fut_vision.result()
+        except Exception as e:
+            logger.error(f"Failed to initialize vision system: {e}")
+            vision_system = None
     
     logger.info("\nSystem initialization complete!")
     logger.info("=" * 60)
@@ -123,24 +135,25 @@ def main():
     # Check dependencies
     errors, logger = check_dependencies()
     
+    # One Tk root for the whole run; hidden until the main window is built
+    root = tk.Tk()
+    root.withdraw()
+    
     # Show critical errors
     if errors:
         error_msg = "Critical errors detected:\n\n" + "\n".join(f"• {e}" for e in errors)
         error_msg += "\n\nSee terminal/log for details."
         
-        root = tk.Tk()
-        root.withdraw()
-        
         result = messagebox.askyesno(
             "Startup Errors",
             error_msg + "\n\nContinue anyway? (Some features may not work)",
-            icon='warning'
+            icon='warning',
+            parent=root
         )
         
-        root.destroy()
-        
         if not result:
             logger.info("User cancelled startup due to errors")
+            root.destroy()
             return
     
     # Initialize systems
@@ -150,23 +163,27 @@ def main():
         if vision is None:
             messagebox.showerror(
                 "Initialization Error",
-                "Failed to initialize vision system.\n\nCannot continue without camera/model."
+                "Failed to initialize vision system.\n\nCannot continue without camera/model.",
+                parent=root
             )
+            root.destroy()
             return
     
     except Exception as e:
         logger.error(f"System initialization failed: {e}")
         messagebox.showerror(
             "Initialization Error",
-            f"Failed to initialize systems:\n\n{e}\n\nSee log for details."
+            f"Failed to initialize systems:\n\n{e}\n\nSee log for details.",
+            parent=root
         )
+        root.destroy()
         return
     
     # Create and run GUI
     try:
         logger.info("Starting GUI...")
-        root = tk.Tk()
         app = MainWindow(root, vision, robot, state, positions)
+        root.deiconify()
         
         # Handle window close
         root.protocol("WM_DELETE_WINDOW", lambda: on_closing(app, root, logger))
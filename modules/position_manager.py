@@ -3,12 +3,23 @@ Position management system for robot arm
 Handles loading, saving, and validating robot positions
 """
 
+from array import array
+import io
 import json
+import mmap
 import os
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+import numpy as np
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
 import sys
-sys.path.append(str(Path(__file__).parent.parent))
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from config.settings import (
     DEFAULT_HOME_POSITION,
@@ -22,6 +33,58 @@ from config.settings import (
 from utils.logger import RobotLogger
 
 
+# Canonical position names, interned so dict/set probes usually hit the
+# identity fast path before any string compare
+_POSITION_NAMES = tuple(sys.intern(name) for name in POSITION_NAMES)
+_GRIPPER_NAMES = (sys.intern('gripper_open'), sys.intern('gripper_closed'))
+
+# Template for a fresh six-joint array('h')
+_SIX_ZEROS = (0,) * 6
+
+# Buffer size for positions file reads/writes (whole file in one syscall)
+IO_BUFFER_SIZE = 64 * 1024
+
+# Validated file contents keyed by (abs path, mtime_ns, size), shared by
+# every PositionManager in the process
+_POSITIONS_CACHE: Dict[tuple, dict] = {}
+
+
+def _build_fast_validators():
+    """
+    Generate the hot-path validators with JOINT_MIN/JOINT_MAX baked in as
+    literals, so checking an angle does no global lookups. They only say
+    yes for plain in-range ints; everything else takes the reporting path.
+    """
+    jmin, jmax = int(JOINT_MIN), int(JOINT_MAX)
+    checks = ' and '.join(
+        f"type(a{i}) is int and {jmin} <= a{i} <= {jmax}" for i in range(6)
+    )
+    src = (
+        f"def _validate_angle_fast(a):\n"
+        f"    return type(a) is int and {jmin} <= a <= {jmax}\n"
+        f"\n"
+        f"def _validate_position_fast(p):\n"
+        f"    if (type(p) is not list and type(p) is not tuple) or len(p) != 6:\n"
+        f"        return False\n"
+        f"    a0, a1, a2, a3, a4, a5 = p\n"
+        f"    return {checks}\n"
+    )
+    namespace = {}
+    exec(src, namespace)
+    return namespace['_validate_angle_fast'], namespace['_validate_position_fast']
+
+
+_validate_angle_fast, _validate_position_fast = _build_fast_validators()
+
+
+def _map_readonly(fileno: int) -> mmap.mmap:
+    """Map a whole file read-only, prefaulting its pages where supported"""
+    populate = getattr(mmap, 'MAP_POPULATE', 0)
+    if hasattr(mmap, 'PROT_READ'):
+        return mmap.mmap(fileno, 0, flags=mmap.MAP_SHARED | populate, prot=mmap.PROT_READ)
+    return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+
+
 class PositionManager:
     """
     Manage robot positions (save/load from JSON)
@@ -43,126 +106,329 @@ class PositionManager:
         """
         self.logger = RobotLogger()
         self.config_file = config_file
-        self.positions = {}
+        self._config_path = Path(config_file)
+        self._config_abspath = os.path.abspath(config_file)
+        
+        # Joint positions live in one (N, 6) int16 array, one row per name in
+        # POSITION_NAMES; gripper open/closed in a 2-element array
+        self._name_to_row = {name: row for row, name in enumerate(_POSITION_NAMES)}
+        self._angles = np.zeros((len(_POSITION_NAMES), 6), dtype=np.int16)
+        self._gripper_index = {name: index for index, name in enumerate(_GRIPPER_NAMES)}
+        self._gripper = np.zeros(len(self._gripper_index), dtype=np.int16)
+        
+        # Per-row tuples of Python ints, refreshed on write, so reads do not
+        # allocate and never leak numpy scalars to Arm_Lib
+        self._row_tuples: List[Tuple[int, ...]] = [()] * len(_POSITION_NAMES)
+        
+        # Name membership sets (single hash probe instead of list scans)
+        self._valid_names = frozenset(_POSITION_NAMES)
+        self._gripper_names = frozenset(self._gripper_index)
+        
+        # Cached dict view of all positions, dropped on every write
+        self._snapshot = None
+        
+        # Unsaved in-memory changes (see flush())
+        self._dirty = False
+        
+        # Callbacks told the name of each position that changes
+        self._change_listeners: List[Callable[[str], None]] = []
         
         # Initialize with defaults
         self._load_defaults()
         
-        # Try to load from file
-        if os.path.exists(config_file):
-            self.load_positions()
-        else:
-            self.logger.warning(f"Position file not found: {config_file}. Using defaults.")
+        # Load the file in the background; defaults are already in place and
+        # readers block on _loaded only until the (short) load finishes
+        self._lock = threading.RLock()
+        self._loaded = threading.Event()
+        self._load_thread = threading.Thread(target=self._async_load, daemon=True)
+        self._load_thread.start()
+        
+        # Item name -> storage position lookup, built once
+        self._item_to_position = self._build_item_lookup()
+    
+    def _async_load(self):
+        """Background initial load (a missing file is detected by the open itself)"""
+        try:
+            self._load_positions_from_disk()
+        except FileNotFoundError:
+            # Defaults are not on disk yet; dirty until the save below succeeds
+            self._dirty = True
+            self._loaded.set()
+            self.logger.warning("Position file not found: %s. Using defaults.", self.config_file)
             self.save_positions()  # Create default file
+        except Exception as e:
+            self._dirty = True  # In-memory defaults differ from the unreadable file
+            self.logger.error("Failed to load positions: %s", e)
+        finally:
+            self._loaded.set()
+    
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Block until the initial background load has finished"""
+        return self._loaded.wait(timeout)
     
     def _load_defaults(self):
         """Load default positions"""
-        self.positions = {
-            'home': DEFAULT_HOME_POSITION.copy(),
-            'drop_zone': DEFAULT_DROP_ZONE_POSITION.copy(),
+        defaults = {
+            'home': DEFAULT_HOME_POSITION,
+            'drop_zone': DEFAULT_DROP_ZONE_POSITION,
             'observation_position': [90, 60, 60, 60, 90, 90],  # Camera view position for classification
             'travel_position': [90, 80, 30, 80, 90, 90],  # Safe height for carrying items
-            'chair_storage': DEFAULT_HOME_POSITION.copy(),
-            'keyboard_storage': DEFAULT_HOME_POSITION.copy(),
-            'mouse_storage': DEFAULT_HOME_POSITION.copy(),
-            'headphones_storage': DEFAULT_HOME_POSITION.copy(),
-            'mobile_phone_storage': DEFAULT_HOME_POSITION.copy(),
-            'pen_storage': DEFAULT_HOME_POSITION.copy(),
+            'chair_storage': DEFAULT_HOME_POSITION,
+            'keyboard_storage': DEFAULT_HOME_POSITION,
+            'mouse_storage': DEFAULT_HOME_POSITION,
+            'headphones_storage': DEFAULT_HOME_POSITION,
+            'mobile_phone_storage': DEFAULT_HOME_POSITION,
+            'pen_storage': DEFAULT_HOME_POSITION,
             'gripper_open': DEFAULT_GRIPPER_OPEN,
             'gripper_closed': DEFAULT_GRIPPER_CLOSED
         }
+        for name, value in defaults.items():
+            self._store(name, value)
     
-    def get_position(self, position_name: str) -> Optional[List[int]]:
-        """Get joint angles for named position"""
-        if position_name not in self.positions:
-            self.logger.error(f"Position not found: {position_name}")
-            return None
+    def add_change_listener(self, callback: Callable[[str], None]):
+        """Register callback(name), called whenever a position value changes"""
+        self._change_listeners.append(callback)
+    
+    def _store(self, name: str, value):
+        """Write an already-validated position into the arrays"""
+        self._snapshot = None
+        gripper = self._gripper_index.get(name)
+        if gripper is not None:
+            self._gripper[gripper] = int(value)
+        else:
+            row = self._name_to_row[name]
+            if type(value) is not array:
+                value = array('h', [int(a) for a in value])
+            self._angles[row] = value
+            self._row_tuples[row] = tuple(value)
+        
+        # Only after the write, so a listener's cache refill sees the new value
+        for callback in self._change_listeners:
+            callback(name)
+    
+    def _positions_dict(self) -> Dict:
+        """Name -> tuple / int snapshot, rebuilt only after a write"""
+        self._loaded.wait()
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                snapshot = {name: self._row_tuples[row] for name, row in self._name_to_row.items()}
+                for name, index in self._gripper_index.items():
+                    snapshot[name] = int(self._gripper[index])
+                self._snapshot = snapshot
+        return snapshot
+    
+    @property
+    def positions(self) -> Mapping[str, Any]:
+        """All positions as a read-only name -> tuple / int mapping"""
+        return MappingProxyType(self._positions_dict())
+    
+    def get_position(self, position_name: str) -> Optional[Union[Tuple[int, ...], int]]:
+        """
+        Get joint angles for named position
         
-        position = self.positions[position_name]
+        Joint positions come back as a shared tuple of ints (no copy);
+        callers that want to edit one take list(...) of it. Gripper
+        positions are a single int.
+        """
+        if not self._loaded.is_set():
+            self._loaded.wait()
+        
+        row = self._name_to_row.get(position_name)
+        if row is not None:
+            return self._row_tuples[row]
         
-        # Handle gripper positions (single value)
-        if position_name in ['gripper_open', 'gripper_closed']:
-            return position
+        gripper = self._gripper_index.get(position_name)
+        if gripper is not None:
+            return int(self._gripper[gripper])
         
-        # Return copy to prevent modification
-        return position.copy() if isinstance(position, list) else position
+        self.logger.error("Position not found: %s", position_name)
+        return None
+    
+    def get_positions_array(self, position_names: List[str]) -> np.ndarray:
+        """
+        Gather several joint positions as an (len(names), 6) int16 array
+        
+        Raises KeyError for names that are not joint positions.
+        """
+        self._loaded.wait()
+        rows = [self._name_to_row[name] for name in position_names]
+        with self._lock:
+            return self._angles[rows]
     
     def set_position(self, position_name: str, angles: List[int]) -> bool:
-        """Update position (not saved until save_positions called)"""
+        """Update position (not saved until save_positions/flush called)"""
+        # Never let the initial load overwrite an edit made before it finished
+        self._loaded.wait()
+        
         # Validate position name
-        if position_name not in ['gripper_open', 'gripper_closed']:
-            if position_name not in POSITION_NAMES:
-                self.logger.error(f"Invalid position name: {position_name}")
-                return False
+        if not isinstance(position_name, str) or (
+                position_name not in self._gripper_names and position_name not in self._valid_names):
+            self.logger.error("Invalid position name: %s", position_name)
+            return False
+        
+        # Names from the UI are fresh strings; intern so the lookups below
+        # compare by identity
+        position_name = sys.intern(position_name)
         
         # Validate angles
-        if position_name in ['gripper_open', 'gripper_closed']:
+        if position_name in self._gripper_names:
             # Single value for gripper
             if not isinstance(angles, (int, float)):
-                self.logger.error(f"Gripper position must be a single value")
+                self.logger.error("Gripper position must be a single value")
                 return False
             if not self.validate_angle(angles):
                 return False
-            self.positions[position_name] = int(angles)
+            with self._lock:
+                if self.get_position(position_name) != int(angles):
+                    self._store(position_name, angles)
+                    self._dirty = True
         else:
-            # List of 6 angles for joint positions
-            if not self.validate_position(angles):
+            # List of 6 angles for joint positions, validated and coerced in one pass
+            coerced = self._validated_int_list(angles)
+            if coerced is None:
                 return False
-            self.positions[position_name] = [int(a) for a in angles]
+            with self._lock:
+                if self.get_position(position_name) != tuple(coerced):
+                    self._store(position_name, coerced)
+                    self._dirty = True
         
-        self.logger.debug(f"Position updated: {position_name} = {angles}")
+        self.logger.debug("Position updated: %s = %s", position_name, angles)
         return True
     
     def save_positions(self) -> bool:
         """Save current positions to JSON file"""
         try:
             # Ensure directory exists
-            os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
+            self._config_path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(self.config_file, 'w') as f:
-                json.dump(self.positions, f, indent=2)
+            # Encode up front so the file gets one bulk write, not one per token
+            if ORJSON_AVAILABLE:
+                data = orjson.dumps(self._positions_dict(), option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(self._positions_dict(), indent=2).encode('utf-8')
             
-            self.logger.info(f"Positions saved to {self.config_file}")
+            # Write a sibling temp file and rename it over the target, so a
+            # crash mid-write never leaves a truncated positions.json
+            tmp_path = self._config_path.with_name(self._config_path.name + '.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, self._config_path)
+            
+            self._dirty = False
+            self.logger.info("Positions saved to %s", self.config_file)
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to save positions: {e}")
+            self.logger.error("Failed to save positions: %s", e)
             return False
     
+    def flush(self) -> bool:
+        """Save positions only if they changed since the last save/load"""
+        if not self._dirty:
+            return True
+        return self.save_positions()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+        return False
+    
     def load_positions(self) -> bool:
         """Load positions from JSON file"""
         try:
-            with open(self.config_file, 'r') as f:
-                loaded = json.load(f)
-            
-            # Validate and update positions
-            for name, value in loaded.items():
-                if name in ['gripper_open', 'gripper_closed']:
-                    if self.validate_angle(value):
-                        self.positions[name] = value
-                elif name in POSITION_NAMES:
-                    if self.validate_position(value):
-                        self.positions[name] = value
-            
-            self.logger.info(f"Positions loaded from {self.config_file}")
+            self._load_positions_from_disk()
             return True
             
         except Exception as e:
-            self.logger.error(f"Failed to load positions: {e}")
+            self._dirty = True  # Memory no longer matches what is on disk
+            self.logger.error("Failed to load positions: %s", e)
             return False
     
-    def get_all_positions(self) -> Dict:
-        """Return all positions dictionary"""
-        return self.positions.copy()
+    def _load_positions_from_disk(self):
+        """
+        Open, validate and apply the positions file
+        
+        Raises FileNotFoundError (and decode errors) to the caller; the file
+        is opened once and its fstat serves both the cache key and the size.
+        """
+        with io.open(self._config_path, 'rb', buffering=IO_BUFFER_SIZE) as f:
+            st = os.fstat(f.fileno())
+            
+            # Same file, unchanged since last parse: reuse the validated values
+            key = (self._config_abspath, st.st_mtime_ns, st.st_size)
+            cached = _POSITIONS_CACHE.get(key)
+            if cached is not None:
+                with self._lock:
+                    for name, value in cached.items():
+                        self._store(name, value)
+                self.logger.info("Positions loaded from %s (cached)", self.config_file)
+                return
+            
+            loaded = self._read_positions_file(f, st.st_size)
+        
+        # Validate and update positions (joint positions checked as one batch)
+        valid = {}
+        joint_names = []
+        joint_values = []
+        for name, value in loaded.items():
+            if name in self._gripper_names:
+                if self.validate_angle(value):
+                    valid[name] = value
+            elif name in self._valid_names:
+                joint_names.append(name)
+                joint_values.append(value)
+        
+        for name, value, ok in zip(joint_names, joint_values,
+                                   self.validate_positions_batch(joint_names, joint_values)):
+            if ok:
+                valid[name] = tuple(value)
+        
+        with self._lock:
+            for name, value in valid.items():
+                self._store(name, value)
+        _POSITIONS_CACHE[key] = valid
+        
+        self.logger.info("Positions loaded from %s", self.config_file)
+    
+    def _read_positions_file(self, f, size: int) -> dict:
+        """
+        Decode the open positions file; with orjson the file is mapped and
+        parsed in place instead of being copied into a bytes object first
+        """
+        if ORJSON_AVAILABLE and size > 0:
+            with _map_readonly(f.fileno()) as mm:
+                view = memoryview(mm)
+                try:
+                    return orjson.loads(view)
+                finally:
+                    view.release()
+        
+        data = f.read()
+        if ORJSON_AVAILABLE:
+            return orjson.loads(data)
+        return json.loads(data)
+    
+    def get_all_positions(self) -> Mapping[str, Any]:
+        """
+        Return all positions as a read-only mapping (no copy)
+        
+        Call dict(...) on it for a mutable copy.
+        """
+        return MappingProxyType(self._positions_dict())
     
     def validate_angle(self, angle: float) -> bool:
         """Validate single angle is within safe range"""
+        if _validate_angle_fast(angle):
+            return True
+        
         if not isinstance(angle, (int, float)):
-            self.logger.error(f"Angle must be numeric: {angle}")
+            self.logger.error("Angle must be numeric: %s", angle)
             return False
         
         if not (JOINT_MIN <= angle <= JOINT_MAX):
-            self.logger.error(f"Angle out of range ({JOINT_MIN}-{JOINT_MAX}): {angle}")
+            self.logger.error("Angle out of range (%s-%s): %s", JOINT_MIN, JOINT_MAX, angle)
             return False
         
         return True
@@ -172,24 +438,107 @@ class PositionManager:
         Validate joint angles are within safe ranges
         Typically: 0-180 degrees per joint
         """
-        if not isinstance(angles, list):
-            self.logger.error(f"Position must be a list: {type(angles)}")
+        # Fast path: six in-range ints, no logger or numpy involved
+        if _validate_position_fast(angles):
+            return True
+        
+        return self._validate_position_slow(angles)
+    
+    def _validated_int_list(self, angles) -> Optional[array]:
+        """
+        Validate six joint angles and coerce them to ints in the same pass
+        
+        Returns:
+            array('h') of the six angles, or None (errors already logged)
+        """
+        if type(angles) in (list, tuple) and len(angles) == 6:
+            coerced = array('h', _SIX_ZEROS)
+            jmin, jmax = JOINT_MIN, JOINT_MAX
+            for i, a in enumerate(angles):
+                if type(a) not in (int, float) or not (jmin <= a <= jmax):
+                    break
+                coerced[i] = int(a)
+            else:
+                return coerced
+        
+        # Bad or unusual input: let the full validator decide and report
+        if not self._validate_position_slow(angles):
+            return None
+        return array('h', [int(a) for a in angles])
+    
+    def _validate_position_slow(self, angles) -> bool:
+        """Full validation with error reporting (floats, bad types, range)"""
+        if not isinstance(angles, (list, tuple)):
+            self.logger.error("Position must be a list: %s", type(angles))
             return False
         
         if len(angles) != 6:
-            self.logger.error(f"Position must have 6 angles, got {len(angles)}")
+            self.logger.error("Position must have 6 angles, got %d", len(angles))
             return False
         
-        for i, angle in enumerate(angles):
-            if not self.validate_angle(angle):
-                self.logger.error(f"Invalid angle at joint {i+1}: {angle}")
-                return False
+        # One vectorized range check instead of six validate_angle calls
+        try:
+            arr = np.asarray(angles)
+        except (TypeError, ValueError):
+            arr = None
+        
+        if arr is None or arr.shape != (6,) or not np.issubdtype(arr.dtype, np.number):
+            self.logger.error("Angles must be numeric: %s", angles)
+            return False
+        
+        in_range = (arr >= JOINT_MIN) & (arr <= JOINT_MAX)
+        if not in_range.all():
+            i = int(np.argmax(~in_range))
+            self.logger.error("Angle out of range (%s-%s): %s", JOINT_MIN, JOINT_MAX, angles[i])
+            self.logger.error("Invalid angle at joint %d: %s", i + 1, angles[i])
+            return False
         
         return True
     
+    def validate_positions_batch(self, names: List[str], arrays: List[List[int]]) -> List[bool]:
+        """
+        Validate many joint positions at once
+        
+        Well-formed rows (6 numbers) are stacked into an (N, 6) array and
+        range-checked in one pass; anything else falls back to
+        validate_position so it is logged the same way.
+        
+        Args:
+            names: Position names (used for error messages)
+            arrays: Joint angle lists, one per name
+        
+        Returns:
+            One bool per position, in order
+        """
+        results = [False] * len(arrays)
+        rows = []
+        row_index = []
+        for i, angles in enumerate(arrays):
+            if (isinstance(angles, (list, tuple)) and len(angles) == 6
+                    and all(isinstance(a, (int, float)) for a in angles)):
+                rows.append(angles)
+                row_index.append(i)
+            else:
+                results[i] = self.validate_position(angles)
+        
+        if rows:
+            A = np.asarray(rows, dtype=np.float64)
+            mask = ((A >= JOINT_MIN) & (A <= JOINT_MAX)).all(axis=1)
+            for i, ok in zip(row_index, mask.tolist()):
+                if not ok:
+                    self.logger.error("Invalid position %s: %s", names[i], arrays[i])
+                    # Re-run the scalar check for its per-joint error message
+                    self.validate_position(arrays[i])
+                results[i] = ok
+        
+        return results
+    
     def reset_to_defaults(self):
         """Reset all positions to defaults"""
-        self._load_defaults()
+        self._loaded.wait()
+        with self._lock:
+            self._load_defaults()
+            self._dirty = True
         self.logger.info("Positions reset to defaults")
     
     def get_storage_position_for_item(self, item_name: str) -> Optional[str]:
@@ -202,21 +551,31 @@ class PositionManager:
         Returns:
             position_name: e.g., 'chair_storage', 'mouse_storage'
         """
-        # Convert item name to position name
-        # 'Chair' -> 'chair_storage'
-        # 'Computer Mouse' -> 'mouse_storage'
-        
-        item_lower = item_name.lower()
-        
-        # Handle 'Computer X' items
-        if item_lower.startswith('computer '):
-            item_lower = item_lower.replace('computer ', '')
-        
-        # Replace spaces with underscores
-        position_name = item_lower.replace(' ', '_') + '_storage'
-        
-        if position_name in self.positions:
+        position_name = self._item_to_position.get(item_name.lower())
+        if position_name is not None:
             return position_name
         
-        self.logger.error(f"No storage position found for item: {item_name}")
+        self.logger.error("No storage position found for item: %s", item_name)
         return None
+    
+    def _build_item_lookup(self) -> Dict[str, str]:
+        """
+        Map every accepted (lowercased) item name to its storage position
+        
+        'chair' / 'computer chair' / 'mobile phone' / 'mobile_phone' are all
+        resolved here once, so lookups are a single dict probe:
+            'Chair' -> 'chair_storage'
+            'Computer Mouse' -> 'mouse_storage'
+        """
+        lookup = {}
+        for position_name in self._name_to_row:
+            if not position_name.endswith('_storage'):
+                continue
+            
+            base = position_name[:-len('_storage')]
+            label = base.replace('_', ' ')
+            lookup[sys.intern(base)] = position_name
+            lookup[sys.intern(label)] = position_name
+            lookup[sys.intern('computer ' + label)] = position_name
+        
+        return lookup
@@ -3,11 +3,18 @@ Robot controller for Yahboom Dofbot arm
 Handles all robot movements and operations
 """
 
+import atexit
+import logging
+import platform
 import time
-from typing import List, Optional, Callable, Dict
-import sys
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent))
+import weakref
+import queue
+import threading
+from concurrent.futures import Future
+from functools import partial
+from dataclasses import dataclass
+import numpy as np
+from typing import Any, List, Optional, Callable, Dict, Tuple
 
 try:
     from Arm_Lib import Arm_Device
@@ -19,12 +26,146 @@ except ImportError:
 from config.settings import (
     SPEED_NORMAL,
     SPEED_SLOW,
-    SPEED_FAST
+    SPEED_FAST,
+    SERVO_POSITION_TOLERANCE,
+    SERVO_POLL_INTERVAL,
+    SERVO_DEG_PER_MS,
+    SERIAL_MIN_PACKET_INTERVAL,
+    RECOVERY_TIMEOUT,
+    I2C_BUS_CLOCK_PATH,
+    I2C_RECOMMENDED_CLOCK_HZ
 )
 from utils.logger import RobotLogger
 from modules.position_manager import PositionManager
 
 
+# Travel time commanded for every gripper (servo 6) write, in ms
+GRIPPER_TRAVEL_MS = 500
+
+
+def _release_arm(arm):
+    """Finalizer: release the arm's I2C handle (no logging, may run at exit)"""
+    try:
+        arm.bus.close()
+    except Exception:
+        pass
+
+
+def _close_at_exit(ref):
+    """atexit hook: close a controller that was never closed (referenced only weakly)"""
+    controller = ref()
+    if controller is not None:
+        controller.close(home=False)
+
+
+@dataclass
+class RobotCmd:
+    """
+    One step of a precomputed borrow/return plan
+    
+    Arm steps carry all six angles (gripper included); gripper steps
+    carry just the servo 6 angle. A step with an error message is fatal
+    if it fails; one without logs a warning and runs its fallback, if any.
+    """
+    angles: Tuple[int, ...]
+    speed: int
+    channel: str  # 'arm' or 'gripper'
+    status: Optional[str] = None
+    settle: float = 0.0  # Extra pause after the step
+    error: Optional[str] = None
+    action: str = ''  # Gripper steps: 'open' or 'close'
+    fallback: Optional[Callable[[], bool]] = None  # Run when a non-fatal step fails
+
+
+_GRIPPER_ACTIONS = {
+    'open': ("Opening", "opened", "open"),
+    'close': ("Closing", "closed", "close"),
+}
+
+
+class Channel:
+    """
+    Worker thread with its own command queue
+    
+    Commands on one channel run strictly in order; separate channels
+    run concurrently (e.g. the gripper closing while the arm moves).
+    """
+    
+    def __init__(self, name: str):
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"robot-{name}", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        """Run queued commands one at a time and resolve their futures"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                func, args, kwargs, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            finally:
+                # Do not hold the last command (and its bound owner) while idle
+                item = func = args = kwargs = future = None
+                self._queue.task_done()
+    
+    def on_channel(self) -> bool:
+        """True when called from this channel's own worker thread"""
+        return threading.current_thread() is self._thread
+    
+    def submit(self, cmd: Callable, *args: Any, **kwargs: Any) -> Future:
+        """
+        Queue a command without waiting for it
+        
+        Commands submitted from the channel's own thread (e.g. a move
+        issued inside a pick sequence) run inline so they cannot deadlock.
+        """
+        future = Future()
+        if self.on_channel():
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(cmd(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+        
+        self._queue.put((cmd, args, kwargs, future))
+        return future
+    
+    def is_busy(self) -> bool:
+        """True while any command is queued or running"""
+        return self._queue.unfinished_tasks > 0
+    
+    def join(self):
+        """Block until every queued command has finished"""
+        if not self.on_channel():
+            self._queue.join()
+    
+    def flush(self):
+        """Drop commands that have not started yet"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                item[3].cancel()
+            self._queue.task_done()
+    
+    def stop(self, timeout: float = 2.0):
+        """Stop the worker after everything already queued has run"""
+        if self._thread.is_alive() and not self.on_channel():
+            self._queue.put(None)
+            self._thread.join(timeout=timeout)
+
+
 class RobotController:
     """
     Control robot arm movements
@@ -37,9 +178,49 @@ class RobotController:
         Import as: from Arm_Lib import Arm_Device
         """
         self.logger = RobotLogger()
+        self._dbg = self.logger.isEnabledFor(logging.DEBUG)  # Skip building debug messages when off
         self.position_manager = position_manager
         self.arm = None
-        self.current_angles = [90, 90, 90, 90, 90, 90]
+        self.current_angles = np.array([90, 90, 90, 90, 90, 90], dtype=np.int16)
+        self._angles_synced = False  # current_angles reflect a commanded pose (not just the initial guess)
+        self._angles_lock = threading.Lock()
+        
+        # Position lookups are cached; PositionManager invalidates on write
+        self._pos_cache: Dict[str, Any] = {}
+        invalidate_ref = weakref.WeakMethod(self.invalidate_position_cache)
+        
+        def _on_position_change(name):
+            # Holds the controller weakly, so the manager does not keep it alive
+            invalidate = invalidate_ref()
+            if invalidate is not None:
+                invalidate(name)
+        
+        self.position_manager.add_change_listener(_on_position_change)
+        
+        # Position name -> validated int tuple, and -> approach angles at
+        # travel height; see _build_position_tables
+        self._prebuilt: Dict[str, Tuple[int, ...]] = {}
+        self._approach_table: Dict[str, Tuple[int, ...]] = {}
+        self._tables_stale = True
+        self._build_position_tables()
+        
+        # Arm joints and gripper are driven from separate channels so they can
+        # move at the same time; the I2C bus itself is shared between them
+        self._bus_lock = threading.Lock()
+        self._min_packet_interval = SERIAL_MIN_PACKET_INTERVAL
+        self._last_write = 0.0
+        self.arm_channel = Channel("arm")
+        self.gripper_channel = Channel("gripper")
+        self._channels = (self.arm_channel, self.gripper_channel)
+        
+        # Explicit close() is preferred (or use as a context manager); this
+        # only catches an interpreter exit without one, and skips homing.
+        # The hook holds the controller weakly so the finalizer below can
+        # still run if it is dropped without close()
+        self._closed = False
+        self._finalizer = None
+        self._atexit_hook = partial(_close_at_exit, weakref.ref(self))
+        atexit.register(self._atexit_hook)
         
         if not ARM_LIB_AVAILABLE:
             self.logger.error("✗ Arm_Lib not available - robot control disabled")
@@ -47,8 +228,10 @@ class RobotController:
         
         try:
             self.arm = Arm_Device()
+            self._finalizer = weakref.finalize(self, _release_arm, self.arm)
             time.sleep(0.1)
             self.logger.info("✓ Robot arm initialized")
+            self._check_bus_clock()
             
             # Move to home position
             self.move_home()
@@ -57,6 +240,136 @@ class RobotController:
             self.logger.error(f"✗ Failed to initialize robot arm: {e}")
             self.arm = None
     
+    def _check_bus_clock(self):
+        """
+        Log a hint if the arm's I2C bus runs below the recommended clock
+        
+        The bus rate is fixed by the device tree, so it can only be
+        reported here; see SETUP.md for how to raise it.
+        """
+        if platform.system() != "Linux":
+            return
+        
+        try:
+            with open(I2C_BUS_CLOCK_PATH, 'rb') as f:
+                clock_hz = int.from_bytes(f.read(4), 'big')
+        except OSError:
+            return  # Not exposed on this board
+        
+        if clock_hz < I2C_RECOMMENDED_CLOCK_HZ:
+            self.logger.info(
+                "I2C bus clock is %d Hz; %d Hz shortens every servo command "
+                "(see SETUP.md, 'Faster I2C Bus')", clock_hz, I2C_RECOMMENDED_CLOCK_HZ
+            )
+    
+    # ========== COMMAND DISPATCH ==========
+    
+    def submit(self, cmd: Callable, *args: Any, **kwargs: Any) -> Future:
+        """Queue a command on the arm channel without waiting for it"""
+        return self.arm_channel.submit(cmd, *args, **kwargs)
+    
+    def is_busy(self) -> bool:
+        """True while any channel has a command queued or running"""
+        return any(channel.is_busy() for channel in self._channels)
+    
+    def wait_idle(self):
+        """Block until every channel has finished its commands"""
+        for channel in self._channels:
+            channel.join()
+    
+    def _flush_channels(self):
+        """Main channel: drop queued commands on every sub-channel"""
+        for channel in self._channels:
+            channel.flush()
+    
+    def _serial_write(self, fn: Callable, *args):
+        """
+        Send one servo command, spaced at least SERIAL_MIN_PACKET_INTERVAL
+        after the previous one so the firmware does not drop it
+        """
+        with self._bus_lock:
+            dt = time.monotonic() - self._last_write
+            if dt < self._min_packet_interval:
+                time.sleep(self._min_packet_interval - dt)
+            try:
+                fn(*args)
+            finally:
+                self._last_write = time.monotonic()
+    
+    @staticmethod
+    def _resolved(value: Any) -> Future:
+        """Future that is already complete"""
+        future = Future()
+        future.set_result(value)
+        return future
+    
+    # ========== POSITION CACHE ==========
+    
+    def _cached_pos(self, name: str):
+        """position_manager.get_position, memoised per name"""
+        try:
+            return self._pos_cache[name]
+        except KeyError:
+            value = self.position_manager.get_position(name)
+            self._pos_cache[name] = value
+            return value
+    
+    def invalidate_position_cache(self, name: Optional[str] = None):
+        """Forget one cached position, or all of them"""
+        if name is None:
+            self._pos_cache.clear()
+        else:
+            self._pos_cache.pop(name, None)
+        
+        # Rebuilt on next use; this can run on PositionManager's load thread
+        self._tables_stale = True
+    
+    def _build_position_tables(self):
+        """
+        Precompute per-position move targets
+        
+        _prebuilt holds each joint position as a validated tuple of ints,
+        ready to send. _approach_table holds each position's approach
+        angles: same base rotation (J1), wrist roll and gripper, with
+        shoulder, elbow and wrist pitch (J2-J4) from travel_position.
+        """
+        # Cleared before the positions are read: a change that lands while
+        # building marks the tables stale again instead of being lost
+        self._tables_stale = False
+        
+        prebuilt = {}
+        for name, pos in self.position_manager.get_all_positions().items():
+            if isinstance(pos, int):
+                continue
+            angles = tuple(int(a) for a in pos)
+            if self.position_manager.validate_position(angles):
+                prebuilt[name] = angles
+        
+        table = {}
+        travel = prebuilt.get('travel_position')
+        if travel is not None:
+            for name, pos in prebuilt.items():
+                approach = list(pos)
+                approach[1], approach[2], approach[3] = travel[1], travel[2], travel[3]
+                table[name] = tuple(approach)
+        
+        self._prebuilt = prebuilt
+        self._approach_table = table
+    
+    def _approach_for(self, name: str) -> Optional[Tuple[int, ...]]:
+        """Approach angles for a position, or None without a travel position"""
+        if self._tables_stale:
+            self._build_position_tables()
+        return self._approach_table.get(name)
+    
+    def _prebuilt_for(self, name: str) -> Optional[Tuple[int, ...]]:
+        """Validated angles for a named joint position, or None"""
+        if self._tables_stale:
+            self._build_position_tables()
+        return self._prebuilt.get(name)
+    
+    # ========== MOVEMENT ==========
+    
     def is_connected(self) -> bool:
         """Check if robot is connected"""
         return self.arm is not None
@@ -76,17 +389,38 @@ class RobotController:
             self.logger.error("Robot not connected")
             return False
         
-        # Get position from manager
-        angles = self.position_manager.get_position(position_name)
+        # Look up the prebuilt (already validated) angles
+        angles = self._prebuilt_for(position_name)
         if angles is None:
-            self.logger.error(f"Position not found: {position_name}")
-            return False
+            if self._cached_pos(position_name) is None:
+                self.logger.error(f"Position not found: {position_name}")
+                return False
+            # Stored but not a valid joint position: let validation report it
+            return self.move_to_joint_angles(self._cached_pos(position_name), speed)
         
         # Move to position
-        self.logger.info(f"Moving to {position_name}: {angles}")
-        return self.move_to_joint_angles(angles, speed)
+        self.logger.info("Moving to %s: %s", position_name, angles)
+        return self.move_to_joint_angles_prevalidated(angles, speed)
+    
+    def submit_move_to_joint_angles(self, angles: List[int], speed: int = SPEED_NORMAL) -> Future:
+        """Queue a joint move and return its Future (resolves to success bool)"""
+        return self.submit(self._move_to_joint_angles, angles, speed)
     
     def move_to_joint_angles(self, angles: List[int], speed: int = SPEED_NORMAL) -> bool:
+        """Move to specific joint angles [j1, j2, j3, j4, j5, j6] and wait for completion"""
+        return self.submit_move_to_joint_angles(angles, speed).result()
+    
+    def move_to_joint_angles_prevalidated(self, angles: Tuple[int, ...], speed: int = SPEED_NORMAL) -> bool:
+        """
+        move_to_joint_angles without the range check
+        
+        Only for internal callers whose angles have already been through
+        validate_position (prebuilt positions, _descend_angles).
+        """
+        return self.submit(self._move_to_joint_angles, angles, speed, True).result()
+    
+    def _move_to_joint_angles(self, angles: List[int], speed: int = SPEED_NORMAL,
+                              prevalidated: bool = False) -> bool:
         """
         Move to specific joint angles [j1, j2, j3, j4, j5, j6]
         
@@ -99,78 +433,180 @@ class RobotController:
             self.logger.error("Robot not connected")
             return False
         
-        if not self.position_manager.validate_position(angles):
+        if not prevalidated and not self.position_manager.validate_position(angles):
             self.logger.error(f"Invalid position: {angles}")
             return False
         
+        target = np.array(angles, dtype=np.int16)
+        with self._angles_lock:
+            previous_angles = self.current_angles
+            if self._angles_synced and np.abs(target - previous_angles).max() <= 1:
+                if self._dbg:
+                    self.logger.debug("No-op move skipped: %s", angles)
+                return True
+        
+        # Arm_Lib gets plain Python ints
+        target_list = target.tolist()
+        
         try:
+            
             # Send movement command
-            self.arm.Arm_serial_servo_write6(
-                angles[0], angles[1], angles[2],
-                angles[3], angles[4], angles[5],
+            self._serial_write(
+                self.arm.Arm_serial_servo_write6,
+                target_list[0], target_list[1], target_list[2],
+                target_list[3], target_list[4], target_list[5],
                 speed
             )
             
             # Update current angles
-            self.current_angles = angles.copy()
+            with self._angles_lock:
+                self.current_angles = target
+                self._angles_synced = True
             
             # Wait for movement to complete
-            # Speed is in ms, add small buffer
-            wait_time = speed / 1000.0 + 0.5
-            time.sleep(wait_time)
+            self._wait_until_reached(target_list, speed, previous_angles.tolist())
             
-            self.logger.debug(f"Moved to {angles}")
+            if self._dbg:
+                self.logger.debug("Moved to %s", angles)
             return True
             
         except Exception as e:
             self.logger.error(f"Movement error: {e}")
             return False
     
+    def _wait_until_reached(self, target_angles: List[int], speed: int,
+                            previous_angles: Optional[List[int]] = None,
+                            tol: int = SERVO_POSITION_TOLERANCE):
+        """
+        Block until every arm joint reports its target angle (within tol)
+        
+        Polls Arm_serial_servo_read for joints 1-5 every SERVO_POLL_INTERVAL
+        and returns as soon as they are in place. The gripper (servo 6) is
+        left out: holding an item it stops short of its target, and it has
+        its own settle on the gripper channel. The old fixed wait of
+        speed/1000 + 0.5 s is kept as the upper bound. If the servos give
+        no feedback, sleeps for an estimate based on the largest joint delta.
+        """
+        deadline = time.monotonic() + speed / 1000.0 + 0.5
+        
+        while True:
+            with self._bus_lock:
+                readings = [self.arm.Arm_serial_servo_read(i) for i in range(1, 6)]
+            if any(r is None for r in readings):
+                break
+            if all(abs(r - t) <= tol for r, t in zip(readings, target_angles[:5])):
+                return
+            if time.monotonic() >= deadline:
+                if self._dbg:
+                    self.logger.debug("Move timed out waiting for servos: %s -> %s", readings, target_angles[:5])
+                return
+            time.sleep(SERVO_POLL_INTERVAL)
+        
+        # No feedback: the servo needs at least `speed` ms, plus margin for long moves
+        wait_time = speed / 1000.0 + 0.5
+        if previous_angles is not None:
+            max_delta = max(abs(t - p) for t, p in zip(target_angles, previous_angles))
+            estimate = max(speed / 1000.0, max_delta / SERVO_DEG_PER_MS * 1.1 / 1000.0)
+            wait_time = min(wait_time, estimate)
+        remaining = deadline - time.monotonic()
+        time.sleep(max(0.0, min(wait_time, remaining)))
+    
+    def move_arm_and_gripper(self, angles: List[int], gripper_angle: int,
+                             speed: int = SPEED_NORMAL) -> bool:
+        """
+        Move the arm joints and set the gripper in one six-servo packet
+        
+        Replaces an arm move followed by a separate gripper write.
+        """
+        return self.submit_move_arm_and_gripper(angles, gripper_angle, speed).result()
+    
+    def submit_move_arm_and_gripper(self, angles: List[int], gripper_angle: int,
+                                    speed: int = SPEED_NORMAL) -> Future:
+        """Queue move_arm_and_gripper and return its Future"""
+        fused = list(angles)
+        fused[5] = gripper_angle
+        return self.submit_move_to_joint_angles(fused, speed)
+    
     def open_gripper(self) -> bool:
-        """Open gripper to configured GRIPPER_OPEN angle"""
+        """Open gripper and wait for completion"""
+        return self.submit_open_gripper().result()
+    
+    def submit_open_gripper(self) -> Future:
+        """Queue opening the gripper to the configured GRIPPER_OPEN angle"""
         if not self.is_connected():
-            return False
+            return self._resolved(False)
         
-        angle = self.position_manager.get_position('gripper_open')
-        if angle is None:
-            angle = 131  # Default fallback
-            self.logger.warning("Using default gripper_open angle: 131")
-        
-        try:
-            # Use individual servo control for gripper (servo 6)
-            self.logger.debug(f"Opening gripper to angle: {angle}")
-            self.arm.Arm_serial_servo_write(6, angle, 500)
-            self.current_angles[5] = angle  # Update servo 6 (index 5)
-            time.sleep(0.6)
-            self.logger.debug("Gripper opened")
-            return True
-        except Exception as e:
-            self.logger.error(f"Failed to open gripper: {e}")
-            return False
+        angle = self._gripper_target('gripper_open', 131)
+        return self._submit_gripper(angle, "Opening", "opened", "open")
     
     def close_gripper(self) -> bool:
-        """Close gripper to configured GRIPPER_CLOSED angle"""
+        """Close gripper and wait for completion"""
+        return self.submit_close_gripper().result()
+    
+    def submit_close_gripper(self) -> Future:
+        """Queue closing the gripper to the configured GRIPPER_CLOSED angle"""
         if not self.is_connected():
-            return False
+            return self._resolved(False)
         
-        angle = self.position_manager.get_position('gripper_closed')
+        angle = self._gripper_target('gripper_closed', 15)
+        return self._submit_gripper(angle, "Closing", "closed", "close")
+    
+    def _gripper_target(self, name: str, default: int) -> int:
+        """Configured gripper angle, or the built-in default if not calibrated"""
+        angle = self._cached_pos(name)
         if angle is None:
-            angle = 15  # Default fallback
-            self.logger.warning("Using default gripper_closed angle: 15")
+            angle = default  # Default fallback
+            self.logger.warning(f"Using default {name} angle: {default}")
+        return angle
+    
+    def _submit_gripper(self, angle: int, verb: str, done: str, action: str) -> Future:
+        """
+        Queue a gripper move on the gripper channel
+        
+        current_angles[5] is only updated once the write has succeeded
+        (see _write_gripper).
+        """
+        with self._angles_lock:
+            delta = abs(angle - int(self.current_angles[5]))
+            if self._angles_synced and delta < SERVO_POSITION_TOLERANCE:
+                return self._resolved(True)  # Already there
         
+        wait_time = self._settle_time(delta, GRIPPER_TRAVEL_MS / 1000.0, 0.6)
+        return self.gripper_channel.submit(self._write_gripper, angle, wait_time, verb, done, action)
+    
+    @staticmethod
+    def _settle_time(delta: float, servo_time: float, max_wait: float) -> float:
+        """
+        Seconds to wait for a servo to travel delta degrees
+        
+        Never less than servo_time (the travel time the servo was commanded
+        with), and capped at the old fixed wait.
+        """
+        estimate = delta / SERVO_DEG_PER_MS / 1000.0 + 0.05
+        return max(servo_time, min(max_wait, estimate))
+    
+    def _write_gripper(self, angle: int, wait_time: float, verb: str, done: str, action: str) -> bool:
+        """Drive servo 6 and wait for it to settle (runs on the gripper channel)"""
         try:
             # Use individual servo control for gripper (servo 6)
-            self.logger.debug(f"Closing gripper to angle: {angle}")
-            self.arm.Arm_serial_servo_write(6, angle, 500)
-            self.current_angles[5] = angle  # Update servo 6 (index 5)
-            time.sleep(0.6)
-            self.logger.debug("Gripper closed")
+            if self._dbg:
+                self.logger.debug("%s gripper to angle: %s", verb, angle)
+            self._serial_write(self.arm.Arm_serial_servo_write, 6, angle, GRIPPER_TRAVEL_MS)
+            with self._angles_lock:
+                self.current_angles[5] = angle  # Update servo 6 (index 5)
+            time.sleep(wait_time)
+            if self._dbg:
+                self.logger.debug("Gripper %s", done)
             return True
         except Exception as e:
-            self.logger.error(f"Failed to close gripper: {e}")
+            self.logger.error(f"Failed to {action} gripper: {e}")
             return False
     
     def move_wrist(self, angle: int, speed: int = 500) -> bool:
+        """Move wrist (servo 5) and wait for completion"""
+        return self.submit(self._move_wrist, angle, speed).result()
+    
+    def _move_wrist(self, angle: int, speed: int = 500) -> bool:
         """Move wrist (servo 5) to specific angle (0-270)"""
         if not self.is_connected():
             return False
@@ -179,11 +615,19 @@ class RobotController:
             self.logger.error(f"Wrist angle out of range (0-270): {angle}")
             return False
         
+        with self._angles_lock:
+            delta = abs(angle - int(self.current_angles[4]))
+            synced = self._angles_synced
+        if synced and delta < SERVO_POSITION_TOLERANCE:
+            return True  # Already there
+        
         try:
-            self.logger.debug(f"Moving wrist to angle: {angle}")
-            self.arm.Arm_serial_servo_write(5, angle, speed)
-            self.current_angles[4] = angle  # Update servo 5 (index 4)
-            time.sleep(speed / 1000.0 + 0.1)
+            if self._dbg:
+                self.logger.debug("Moving wrist to angle: %s", angle)
+            self._serial_write(self.arm.Arm_serial_servo_write, 5, angle, speed)
+            with self._angles_lock:
+                self.current_angles[4] = angle  # Update servo 5 (index 4)
+            time.sleep(self._settle_time(delta, speed / 1000.0, speed / 1000.0 + 0.1))
             return True
         except Exception as e:
             self.logger.error(f"Failed to move wrist: {e}")
@@ -196,7 +640,8 @@ class RobotController:
         """
         # Note: Yahboom Dofbot may not support reading angles
         # Return last known angles instead
-        return self.current_angles.copy()
+        with self._angles_lock:
+            return self.current_angles.tolist()
     
     def lift_to_travel_height(self, status_callback: Optional[Callable] = None) -> bool:
         """
@@ -213,24 +658,25 @@ class RobotController:
             status_callback("Lifting to safe height...")
         
         # Get travel position angles for reference (the "safe" joint configuration)
-        travel_angles = self.position_manager.get_position('travel_position')
+        travel_angles = self._cached_pos('travel_position')
         if travel_angles is None:
             # Fallback: just lift shoulder
             self.logger.warning("travel_position not found, using fallback lift")
-            lifted_angles = self.current_angles.copy()
+            lifted_angles = self.get_current_angles()
             lifted_angles[1] = max(0, lifted_angles[1] - 20)  # Lift shoulder
             lifted_angles[2] = min(180, lifted_angles[2] + 10)  # Adjust elbow
             return self.move_to_joint_angles(lifted_angles, SPEED_NORMAL)
         
         # Create dynamic travel position:
         # Keep current base rotation (J1), but use travel height for J2, J3, J4
-        lifted_angles = self.current_angles.copy()
-        lifted_angles[1] = travel_angles[1]  # Shoulder - use travel height
-        lifted_angles[2] = travel_angles[2]  # Elbow - use travel configuration
-        lifted_angles[3] = travel_angles[3]  # Wrist pitch - use travel configuration
+        with self._angles_lock:
+            lifted = self.current_angles.copy()
+        lifted[1:4] = travel_angles[1:4]  # Shoulder, elbow, wrist pitch - use travel configuration
         # Keep J1 (base), J5 (wrist roll), J6 (gripper) as they are
+        lifted_angles = lifted.tolist()
         
-        self.logger.debug(f"Lifting from {self.current_angles} to {lifted_angles}")
+        if self._dbg:
+            self.logger.debug("Lifting from %s to %s", self.get_current_angles(), lifted_angles)
         return self.move_to_joint_angles(lifted_angles, SPEED_NORMAL)
     
     def move_to_position_keep_gripper(self, position_name: str, speed: int = SPEED_NORMAL) -> bool:
@@ -244,18 +690,34 @@ class RobotController:
             return False
         
         # Get position from manager
-        angles = self.position_manager.get_position(position_name)
+        angles = self._cached_pos(position_name)
         if angles is None:
             self.logger.error(f"Position not found: {position_name}")
             return False
         
         # Keep current gripper angle (index 5 = servo 6)
-        angles_keep_gripper = angles.copy()
-        angles_keep_gripper[5] = self.current_angles[5]
+        angles_keep_gripper = list(angles)
+        angles_keep_gripper[5] = int(self.current_angles[5])
         
-        self.logger.info(f"Moving to {position_name} (keeping gripper): {angles_keep_gripper}")
+        self.logger.info("Moving to %s (keeping gripper): %s", position_name, angles_keep_gripper)
         return self.move_to_joint_angles(angles_keep_gripper, speed)
     
+    def _descend_angles(self, position_name: str, target_angles, gripper_angle: int) -> Optional[List[int]]:
+        """
+        Target position with the given gripper angle, validated up front
+        
+        Pure computation, so pick/place run it while the approach move is
+        still in flight.
+        """
+        angles = list(target_angles)
+        angles[5] = gripper_angle
+        if not self.position_manager.validate_position(angles):
+            self.logger.error(f"Invalid position: {angles}")
+            return None
+        
+        self.logger.info("Moving to %s (keeping gripper): %s", position_name, angles)
+        return angles
+    
     def execute_pick_sequence(self, from_position: str, 
                              status_callback: Optional[Callable] = None) -> bool:
         """
@@ -270,57 +732,69 @@ class RobotController:
         if status_callback:
             status_callback(f"Picking from {from_position}...")
         
-        # Open gripper before approaching
-        if not self.open_gripper():
-            self.logger.warning("Failed to open gripper, continuing anyway")
-        
         # Get the target position angles
-        target_angles = self.position_manager.get_position(from_position)
+        target_angles = self._cached_pos(from_position)
         if target_angles is None:
             self.logger.error(f"Position not found: {from_position}")
             return False
         
-        # Get travel position for safe height reference
-        travel_angles = self.position_manager.get_position('travel_position')
-        if travel_angles is None:
+        gripper_open = None
+        approach_move = None
+        
+        # Approach position: target's base rotation (J1) but at travel height (J2, J3, J4)
+        approach = self._approach_for(from_position)
+        if approach is None:
             self.logger.warning("travel_position not found, moving directly")
+            # Open gripper before approaching; it travels while the arm descends
+            gripper_open = self.submit_open_gripper()
+            open_angle = self._gripper_target('gripper_open', 131)
         else:
-            # Create approach position: target's base rotation (J1) but at travel height (J2, J3, J4)
-            approach_angles = target_angles.copy()
-            approach_angles[1] = travel_angles[1]  # Shoulder at travel height
-            approach_angles[2] = travel_angles[2]  # Elbow at travel config
-            approach_angles[3] = travel_angles[3]  # Wrist pitch at travel config
-            approach_angles[5] = self.current_angles[5]  # Keep gripper open
+            approach_angles = list(approach)
             
             if status_callback:
                 status_callback(f"Moving above {from_position}...")
             
-            # First move to safe height above target
-            if not self.move_to_joint_angles(approach_angles, SPEED_NORMAL):
-                self.logger.warning("Could not move to approach position")
+            # First move to safe height above target, opening the gripper in the same packet
+            open_angle = self._gripper_target('gripper_open', 131)
+            approach_move = self.submit_move_arm_and_gripper(approach_angles, open_angle, SPEED_NORMAL)
+        
+        # Prepare the descent (keeping gripper open) while the arm is still moving
+        descend_angles = self._descend_angles(from_position, target_angles, open_angle)
         
-        # Now descend to the actual pick position (keeping gripper open)
+        if approach_move is not None and not approach_move.result():
+            self.logger.warning("Could not move to approach position")
+        
+        # Now descend to the actual pick position
         if status_callback:
             status_callback(f"Descending to {from_position}...")
         
-        if not self.move_to_position_keep_gripper(from_position, SPEED_NORMAL):
+        if descend_angles is None or not self.move_to_joint_angles_prevalidated(descend_angles, SPEED_NORMAL):
             return False
         
         # Wait for stability
         time.sleep(0.3)
         
-        # Now close gripper to grab the item
-        if not self.close_gripper():
-            return False
+        # Gripper must be fully open before it closes on the item
+        if gripper_open is not None:
+            self.gripper_channel.join()
+            if not gripper_open.result():
+                self.logger.warning("Failed to open gripper, continuing anyway")
         
-        # Wait for grip
-        time.sleep(0.3)
+        # Now close gripper to grab the item, and wait for it to settle: the
+        # lift is a six-servo packet, so sending it early would re-command
+        # servo 6 (and lift with the jaws still moving)
+        gripper_close = self.submit_close_gripper()
+        if not gripper_close.result():
+            return False
         
-        # Lift straight up first (dynamic travel - keeps base rotation, only lifts)
+        # Lift straight up first (dynamic travel - keeps base rotation, only lifts);
+        # servo 6 is sent its current (closed) target unchanged
         if status_callback:
             status_callback("Lifting item...")
         
-        if not self.lift_to_travel_height(status_callback):
+        lifted = self.lift_to_travel_height(status_callback)
+        
+        if not lifted:
             self.logger.warning("Could not lift to travel height")
             # Continue anyway, next movement will handle it
         
@@ -342,35 +816,39 @@ class RobotController:
             status_callback(f"Placing at {to_position}...")
         
         # Get the target position angles
-        target_angles = self.position_manager.get_position(to_position)
+        target_angles = self._cached_pos(to_position)
         if target_angles is None:
             self.logger.error(f"Position not found: {to_position}")
             return False
         
-        # Get travel position for safe height reference
-        travel_angles = self.position_manager.get_position('travel_position')
-        if travel_angles is None:
+        approach_move = None
+        held_angle = int(self.current_angles[5])  # Keep gripper closed (carrying item)
+        
+        # Approach position: target's base rotation (J1) but at travel height (J2, J3, J4)
+        approach = self._approach_for(to_position)
+        if approach is None:
             self.logger.warning("travel_position not found, moving directly")
         else:
-            # Create approach position: target's base rotation (J1) but at travel height (J2, J3, J4)
-            approach_angles = target_angles.copy()
-            approach_angles[1] = travel_angles[1]  # Shoulder at travel height
-            approach_angles[2] = travel_angles[2]  # Elbow at travel config
-            approach_angles[3] = travel_angles[3]  # Wrist pitch at travel config
-            approach_angles[5] = self.current_angles[5]  # Keep gripper closed (carrying item)
+            approach_angles = list(approach)
+            approach_angles[5] = held_angle
             
             if status_callback:
                 status_callback(f"Moving above {to_position}...")
             
             # First move to safe height above target
-            if not self.move_to_joint_angles(approach_angles, SPEED_NORMAL):
-                self.logger.warning("Could not move to approach position")
+            approach_move = self.submit_move_to_joint_angles(approach_angles, SPEED_NORMAL)
+        
+        # Prepare the descent (keeping gripper closed) while the arm is still moving
+        descend_angles = self._descend_angles(to_position, target_angles, held_angle)
+        
+        if approach_move is not None and not approach_move.result():
+            self.logger.warning("Could not move to approach position")
         
-        # Now descend to the actual place position (keeping gripper closed)
+        # Now descend to the actual place position
         if status_callback:
             status_callback(f"Descending to {to_position}...")
         
-        if not self.move_to_position_keep_gripper(to_position, SPEED_NORMAL):
+        if descend_angles is None or not self.move_to_joint_angles_prevalidated(descend_angles, SPEED_NORMAL):
             return False
         
         # Now open gripper to release item
@@ -391,6 +869,140 @@ class RobotController:
         self.logger.info(f"Place sequence completed at {to_position}")
         return True
     
+    # ========== SEQUENCE PLANS ==========
+    
+    def _plan_transfer(self, pick_from: str, place_at: str, end_at: str,
+                       pick_error: str, place_error: str,
+                       place_status: str, end_status: str, end_error: Optional[str],
+                       end_fallback: Optional[Callable[[], bool]] = None) -> Optional[List[RobotCmd]]:
+        """
+        Flat command list for pick -> place -> park
+        
+        Every target is resolved and validated up front, with the gripper
+        angle each arm packet should carry filled in. Returns None if any
+        position is missing, so the caller falls back to the step-by-step
+        sequences (which handle those cases).
+        """
+        pick_pos = self._prebuilt_for(pick_from)
+        place_pos = self._prebuilt_for(place_at)
+        end_pos = self._prebuilt_for(end_at)
+        pick_above = self._approach_for(pick_from)
+        place_above = self._approach_for(place_at)
+        grip_open = self._cached_pos('gripper_open')
+        grip_closed = self._cached_pos('gripper_closed')
+        if None in (pick_pos, place_pos, end_pos, pick_above, place_above, grip_open, grip_closed):
+            return None
+        
+        def arm(angles, gripper, **kwargs):
+            return RobotCmd(tuple(angles[:5]) + (gripper,), SPEED_NORMAL, 'arm', **kwargs)
+        
+        return [
+            # Pick: gripper opens on the way above the target
+            arm(pick_above, grip_open, status=f"Picking from {pick_from}..."),
+            arm(pick_pos, grip_open, status=f"Descending to {pick_from}...", settle=0.3, error=pick_error),
+            RobotCmd((grip_closed,), GRIPPER_TRAVEL_MS, 'gripper', action='close', settle=0.3,
+                     error=pick_error),  # Wait for grip
+            arm(pick_above, grip_closed, status="Lifting item..."),
+            # Place: carry at travel height, release, lift clear
+            arm(place_above, grip_closed, status=place_status),
+            arm(place_pos, grip_closed, status=f"Descending to {place_at}...", error=place_error),
+            RobotCmd((grip_open,), GRIPPER_TRAVEL_MS, 'gripper', action='open', settle=0.3, error=place_error),
+            arm(place_above, grip_open, status="Lifting arm..."),
+            # Park
+            RobotCmd(end_pos, SPEED_NORMAL, 'arm', status=end_status, error=end_error,
+                     fallback=end_fallback),
+        ]
+    
+    def _plan_borrow(self, storage_pos: str) -> Optional[List[RobotCmd]]:
+        """Plan: storage -> drop zone -> home"""
+        return self._plan_transfer(
+            storage_pos, 'drop_zone', 'home',
+            f"Failed to pick from {storage_pos}", "Failed to place at drop zone",
+            "Delivering to drop zone...", "Returning home...", "Failed to return home"
+        )
+    
+    def _plan_return(self, item_name: str, storage_pos: str) -> Optional[List[RobotCmd]]:
+        """Plan: drop zone -> storage -> observation position"""
+        return self._plan_transfer(
+            'drop_zone', storage_pos, 'observation_position',
+            "Failed to pick from drop zone", f"Failed to place at {storage_pos}",
+            f"Storing {item_name}...", "Returning to observation position...", None,
+            end_fallback=self.move_home  # Fallback to home if observation position fails
+        )
+    
+    def _execute_plan(self, plan: List[RobotCmd], status_callback: Optional[Callable] = None) -> bool:
+        """
+        Run a plan through the channels
+        
+        Raises Exception with the step's error message if a fatal step fails.
+        """
+        for cmd in plan:
+            if cmd.status and status_callback:
+                status_callback(cmd.status)
+            
+            if cmd.channel == 'gripper':
+                verb, done, action = _GRIPPER_ACTIONS[cmd.action]
+                ok = self._submit_gripper(cmd.angles[0], verb, done, action).result()
+            else:
+                ok = self.move_to_joint_angles_prevalidated(cmd.angles, cmd.speed)
+            
+            if not ok:
+                if cmd.error:
+                    raise Exception(cmd.error)
+                self.logger.warning(f"Plan step failed, continuing: {cmd.status or cmd.angles}")
+                if cmd.fallback is not None:
+                    cmd.fallback()
+            
+            if cmd.settle:
+                time.sleep(cmd.settle)
+        
+        return True
+    
+    def _borrow_step_by_step(self, storage_pos: str, status_callback: Optional[Callable] = None):
+        """Borrow via the individual sequences (used when no plan can be built)"""
+        # Step 1: Move to storage and pick
+        if not self.execute_pick_sequence(storage_pos, status_callback):
+            raise Exception(f"Failed to pick from {storage_pos}")
+        
+        # Step 2: Deliver to drop zone
+        if status_callback:
+            status_callback("Delivering to drop zone...")
+        
+        if not self.execute_place_sequence('drop_zone', status_callback):
+            raise Exception("Failed to place at drop zone")
+        
+        # Step 3: Return home
+        if status_callback:
+            status_callback("Returning home...")
+        
+        if not self.move_home():
+            raise Exception("Failed to return home")
+    
+    def _return_step_by_step(self, item_name: str, storage_pos: str,
+                             status_callback: Optional[Callable] = None):
+        """Return via the individual sequences (used when no plan can be built)"""
+        # Step 1: Pick from drop zone
+        if not self.execute_pick_sequence('drop_zone', status_callback):
+            raise Exception("Failed to pick from drop zone")
+        
+        # Step 2: Deliver to storage
+        if status_callback:
+            status_callback(f"Storing {item_name}...")
+        
+        if not self.execute_place_sequence(storage_pos, status_callback):
+            raise Exception(f"Failed to place at {storage_pos}")
+        
+        # Step 3: Return to observation position for next item
+        if status_callback:
+            status_callback("Returning to observation position...")
+        
+        if not self.move_to_observation_position(status_callback):
+            # Fallback to home if observation position fails
+            self.logger.warning("Could not move to observation position, going home")
+            self.move_home()
+    
+    # ========== OPERATIONS ==========
+    
     def borrow_item(self, item_name: str, 
                    status_callback: Optional[Callable] = None) -> Dict:
         """
@@ -407,26 +1019,15 @@ class RobotController:
             if storage_pos is None:
                 return {'success': False, 'message': f'No storage position for {item_name}'}
             
-            # Step 1: Move to storage and pick
             if status_callback:
                 status_callback(f"Moving to {item_name} storage...")
             
-            if not self.execute_pick_sequence(storage_pos, status_callback):
-                raise Exception(f"Failed to pick from {storage_pos}")
-            
-            # Step 2: Deliver to drop zone
-            if status_callback:
-                status_callback("Delivering to drop zone...")
-            
-            if not self.execute_place_sequence('drop_zone', status_callback):
-                raise Exception("Failed to place at drop zone")
-            
-            # Step 3: Return home
-            if status_callback:
-                status_callback("Returning home...")
-            
-            if not self.move_home():
-                raise Exception("Failed to return home")
+            # Whole operation as one precomputed plan when every position is known
+            plan = self._plan_borrow(storage_pos)
+            if plan is not None:
+                self._execute_plan(plan, status_callback)
+            else:
+                self._borrow_step_by_step(storage_pos, status_callback)
             
             if status_callback:
                 status_callback(f"✓ {item_name} borrowed successfully!")
@@ -437,14 +1038,31 @@ class RobotController:
         except Exception as e:
             self.logger.error(f"Borrow failed: {e}")
             
-            # Recovery: Try to return home safely
-            try:
-                self.move_home()
-            except:
-                pass
+            # Recovery: Try to return home safely (bounded, in case the arm is stalled)
+            self._recover(self.move_home)
             
             return {'success': False, 'message': str(e)}
     
+    def _recover(self, *moves: Callable) -> bool:
+        """
+        Run recovery moves on the arm channel in order until one succeeds
+        
+        Each gets RECOVERY_TIMEOUT. On a timeout the arm channel is flushed
+        (so nothing queued behind the stalled move runs later) and the
+        remaining moves are skipped.
+        """
+        for move in moves:
+            future = self.submit(move)
+            try:
+                if future.result(timeout=RECOVERY_TIMEOUT):
+                    return True
+            except Exception as e:
+                future.cancel()
+                self.arm_channel.flush()
+                self.logger.error("Recovery timeout: %s", str(e) or type(e).__name__)
+                return False
+        return False
+    
     def return_item(self, item_name: str,
                    status_callback: Optional[Callable] = None) -> Dict:
         """
@@ -461,28 +1079,15 @@ class RobotController:
             if storage_pos is None:
                 return {'success': False, 'message': f'No storage position for {item_name}'}
             
-            # Step 1: Pick from drop zone
             if status_callback:
                 status_callback("Picking item from drop zone...")
             
-            if not self.execute_pick_sequence('drop_zone', status_callback):
-                raise Exception("Failed to pick from drop zone")
-            
-            # Step 2: Deliver to storage
-            if status_callback:
-                status_callback(f"Storing {item_name}...")
-            
-            if not self.execute_place_sequence(storage_pos, status_callback):
-                raise Exception(f"Failed to place at {storage_pos}")
-            
-            # Step 3: Return to observation position for next item
-            if status_callback:
-                status_callback("Returning to observation position...")
-            
-            if not self.move_to_observation_position(status_callback):
-                # Fallback to home if observation position fails
-                self.logger.warning("Could not move to observation position, going home")
-                self.move_home()
+            # Whole operation as one precomputed plan when every position is known
+            plan = self._plan_return(item_name, storage_pos)
+            if plan is not None:
+                self._execute_plan(plan, status_callback)
+            else:
+                self._return_step_by_step(item_name, storage_pos, status_callback)
             
             if status_callback:
                 status_callback(f"✓ {item_name} returned successfully!")
@@ -494,11 +1099,7 @@ class RobotController:
             self.logger.error(f"Return failed: {e}")
             
             # Recovery: Try to return to observation position or home safely
-            try:
-                if not self.move_to_observation_position():
-                    self.move_home()
-            except:
-                pass
+            self._recover(self.move_to_observation_position, self.move_home)
             
             return {'success': False, 'message': str(e)}
     
@@ -511,19 +1112,19 @@ class RobotController:
             status_callback("Moving to observation position...")
         
         # Try to use calibrated observation position first
-        observation_angles = self.position_manager.get_position('observation_position')
+        observation_angles = self._cached_pos('observation_position')
         
         if observation_angles is not None:
             return self.move_to_joint_angles(observation_angles, SPEED_NORMAL)
         
         # Fallback: Use drop zone position but lift higher
         self.logger.warning("observation_position not found, using fallback")
-        drop_zone_angles = self.position_manager.get_position('drop_zone')
+        drop_zone_angles = self._cached_pos('drop_zone')
         if drop_zone_angles is None:
             return False
         
         # Lift camera higher for better view
-        fallback_angles = drop_zone_angles.copy()
+        fallback_angles = list(drop_zone_angles)
         fallback_angles[1] = max(0, fallback_angles[1] - 15)
         
         return self.move_to_joint_angles(fallback_angles, SPEED_NORMAL)
@@ -547,10 +1148,18 @@ class RobotController:
         if not self.is_connected():
             return
         
+        # Runs directly on the caller's thread; queued moves are dropped
+        self._flush_channels()
+        
         try:
-            # Stop all servos
-            for i in range(1, 7):
-                self.arm.Arm_serial_servo_write(i, self.current_angles[i-1], 0)
+            # Stop all servos in a single packet
+            angles = self.get_current_angles()
+            self._serial_write(
+                self.arm.Arm_serial_servo_write6,
+                angles[0], angles[1], angles[2],
+                angles[3], angles[4], angles[5],
+                0
+            )
             
             self.logger.info("Emergency stop completed")
             
@@ -561,18 +1170,42 @@ class RobotController:
         """Return to home position"""
         return self.move_to_position('home', SPEED_NORMAL)
     
-    def cleanup(self):
-        """Safe shutdown of robot"""
+    def close(self, home: bool = True):
+        """
+        Safe shutdown of robot
+        
+        Args:
+            home: Return to home position first (waits for the move)
+        """
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self._atexit_hook)
+        
         if self.is_connected():
             try:
-                self.move_home()
-                time.sleep(1)
-                del self.arm
+                if home:
+                    self.move_home()
+                arm = self.arm
                 self.arm = None
+                if self._finalizer is not None:
+                    self._finalizer.detach()
+                _release_arm(arm)
                 self.logger.info("Robot shutdown complete")
             except Exception as e:
                 self.logger.error(f"Cleanup error: {e}")
+        
+        # Stop the workers once everything queued ahead of shutdown has run
+        for channel in self._channels:
+            channel.stop()
+    
+    def cleanup(self):
+        """Safe shutdown of robot (same as close())"""
+        self.close()
+    
+    def __enter__(self):
+        return self
     
-    def __del__(self):
-        """Ensure cleanup on deletion"""
-        self.cleanup()
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -3,13 +3,16 @@ State management system for tracking item availability
 """
 
 from typing import Dict, List
-import sys
-from pathlib import Path
-sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
 
 from config.settings import ITEM_CLASSES
 from utils.logger import RobotLogger
 
+# Status codes stored in the state array
+AVAILABLE = 0
+LOANED = 1
+
 
 class StateManager:
     """
@@ -24,94 +27,97 @@ class StateManager:
         """
         Initialize all items as LOANED_OUT
         
-        State structure:
-        {
-            'Chair': 'LOANED_OUT',
-            'Computer Keyboard': 'LOANED_OUT',
-            'Computer Mouse': 'LOANED_OUT',
-            'Headphones': 'LOANED_OUT',
-            'Mobile Phone': 'LOANED_OUT',
-            'Pen': 'LOANED_OUT'
-        }
+        State is one uint8 code per item, aligned with ITEM_CLASSES:
+        AVAILABLE (0) or LOANED (1). Status strings are produced only at
+        the API boundary (get_status, get_all_status).
         """
         self.logger = RobotLogger()
-        self.state = {}
+        self._items = list(ITEM_CLASSES)
+        self._idx = {name: i for i, name in enumerate(self._items)}
+        self._status_names = (self.STATUS_AVAILABLE, self.STATUS_LOANED_OUT)
         
         # Initialize all items as loaned out
-        for item in ITEM_CLASSES:
-            self.state[item] = self.STATUS_LOANED_OUT
+        self._arr = np.full(len(self._items), LOANED, dtype=np.uint8)
+        
+        # Status sets kept in step with _arr, so queries never scan
+        self._available = set()
+        self._loaned = set(self._items)
         
         self.logger.info("State initialized - all items marked as LOANED_OUT")
     
+    @property
+    def state(self) -> Dict[str, str]:
+        """Item -> status string (copy)"""
+        return self.get_all_status()
+    
     def get_available_items(self) -> List[str]:
         """Return list of items with status 'AVAILABLE'"""
-        available = [
-            item for item, status in self.state.items()
-            if status == self.STATUS_AVAILABLE
-        ]
-        self.logger.debug(f"Available items: {available}")
-        return available
+        return sorted(self._available, key=self._idx.__getitem__)
     
     def get_loaned_items(self) -> List[str]:
         """Return list of items with status 'LOANED_OUT'"""
-        loaned = [
-            item for item, status in self.state.items()
-            if status == self.STATUS_LOANED_OUT
-        ]
-        self.logger.debug(f"Loaned items: {loaned}")
-        return loaned
+        return sorted(self._loaned, key=self._idx.__getitem__)
     
     def is_available(self, item_name: str) -> bool:
         """Check if specific item is available"""
-        if item_name not in self.state:
-            self.logger.error(f"Unknown item: {item_name}")
-            return False
-        
-        return self.state[item_name] == self.STATUS_AVAILABLE
+        if item_name in self._available:
+            return True
+        if item_name not in self._idx:
+            self.logger.error("Unknown item: %s", item_name)
+        return False
     
     def mark_available(self, item_name: str) -> bool:
         """Mark item as AVAILABLE (after return)"""
-        if item_name not in self.state:
-            self.logger.error(f"Cannot mark unknown item as available: {item_name}")
+        i = self._idx.get(item_name)
+        if i is None:
+            self.logger.error("Cannot mark unknown item as available: %s", item_name)
             return False
         
-        self.state[item_name] = self.STATUS_AVAILABLE
-        self.logger.info(f"Item marked as AVAILABLE: {item_name}")
+        self._arr[i] = AVAILABLE
+        self._loaned.discard(item_name)
+        self._available.add(item_name)
+        self.logger.info("Item marked as AVAILABLE: %s", item_name)
         return True
     
     def mark_loaned(self, item_name: str) -> bool:
         """Mark item as LOANED_OUT (after borrow)"""
-        if item_name not in self.state:
-            self.logger.error(f"Cannot mark unknown item as loaned: {item_name}")
+        i = self._idx.get(item_name)
+        if i is None:
+            self.logger.error("Cannot mark unknown item as loaned: %s", item_name)
             return False
         
-        self.state[item_name] = self.STATUS_LOANED_OUT
-        self.logger.info(f"Item marked as LOANED_OUT: {item_name}")
+        self._arr[i] = LOANED
+        self._available.discard(item_name)
+        self._loaned.add(item_name)
+        self.logger.info("Item marked as LOANED_OUT: %s", item_name)
         return True
     
     def get_status(self, item_name: str) -> str:
         """Get current status of item"""
-        if item_name not in self.state:
-            self.logger.error(f"Unknown item: {item_name}")
+        i = self._idx.get(item_name)
+        if i is None:
+            self.logger.error("Unknown item: %s", item_name)
             return "UNKNOWN"
         
-        return self.state[item_name]
+        return self._status_names[self._arr[i]]
     
     def reset_all_loaned(self):
         """Reset all items to LOANED_OUT (settings option)"""
-        for item in self.state:
-            self.state[item] = self.STATUS_LOANED_OUT
+        self._arr.fill(LOANED)
+        self._available.clear()
+        self._loaned.update(self._items)
         
         self.logger.info("All items reset to LOANED_OUT")
     
     def get_all_status(self) -> Dict[str, str]:
         """Return complete status dictionary"""
-        return self.state.copy()
+        names = self._status_names
+        return {item: names[code] for item, code in zip(self._items, self._arr.tolist())}
     
     def get_item_count_by_status(self) -> Dict[str, int]:
         """Get count of items by status"""
         counts = {
-            self.STATUS_AVAILABLE: len(self.get_available_items()),
-            self.STATUS_LOANED_OUT: len(self.get_loaned_items())
+            self.STATUS_AVAILABLE: len(self._available),
+            self.STATUS_LOANED_OUT: len(self._loaned)
         }
         return counts
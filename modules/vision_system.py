@@ -3,10 +3,14 @@ Computer vision system for item classification
 Handles camera interface and YOLO classification
 """
 
+import threading
+import time
+from collections import deque
+
 import cv2
 import numpy as np
 from ultralytics import YOLO
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
@@ -16,7 +20,13 @@ from config.settings import (
     CAMERA_WIDTH,
     CAMERA_HEIGHT,
     CROP_PERCENTAGE,
+    USE_OPENCL,
     CONFIDENCE_THRESHOLD,
+    INFERENCE_HALF,
+    USE_OPENVINO,
+    OPENVINO_INT8,
+    OPENVINO_INT8_DATA,
+    OPENVINO_INT8_MAX_DROP,
     ITEM_CLASSES,
     CLASS_NAME_MAPPING
 )
@@ -42,11 +52,53 @@ class VisionSystem:
         self.model = None
         self.input_size = None
         
+        # Set by release_camera(); the next capture reopens the device
+        self._camera_released = False
+        
+        # Background reader keeps the newest frames so capture_frame()
+        # never waits on the camera's exposure/decode; started by the
+        # first capture_frame() and stopped when the camera is released
+        self._frames = deque(maxlen=2)
+        self._frame_ready = threading.Event()
+        self._reader_stop = threading.Event()
+        self._reader_release = threading.Event()
+        self._reader = None
+        
+        # Center-crop indices for the camera's frame size, set once the
+        # first frame is read (see _set_crop_slice)
+        self._crop_shape = None
+        self._crop_slice = None
+        
+        # Offload the resize to OpenCL via UMat when enabled and available
+        self._use_opencl = USE_OPENCL and cv2.ocl.haveOpenCL()
+        if self._use_opencl:
+            cv2.ocl.setUseOpenCL(True)
+            self.logger.info("OpenCL available - resizing on the OpenCL device")
+        
         # Load model
         try:
+            if USE_OPENVINO:
+                model_path = self._ensure_openvino_model(model_path)
+            
             self.logger.info(f"Loading model from {model_path}")
-            self.model = YOLO(model_path)
+            self.model = YOLO(model_path, task='classify')
+            
+            # FP16 halves weight/activation bandwidth; ultralytics falls back
+            # to FP32 on devices without half support (e.g. CPU)
+            self.model.overrides['half'] = INFERENCE_HALF
+            
             self.input_size = self.get_model_input_size()
+            
+            # Normalized class names per model index, and ITEM_CLASSES as a
+            # set, so results need no per-frame string work or list scans
+            self._name_table = {idx: self.normalize_class_name(raw) for idx, raw in self.model.names.items()}
+            self._item_class_set = frozenset(ITEM_CLASSES)
+            
+            # classify_item resizes into this buffer instead of allocating a
+            # fresh input image per call
+            self._resize_buf = np.empty((self.input_size, self.input_size, 3), dtype=np.uint8)
+            
+            self._predictor = None  # Built by the first inference (see _infer)
             self.logger.info(f"✓ Model loaded - Expected input size: {self.input_size}x{self.input_size}")
         except Exception as e:
             self.logger.error(f"✗ Failed to load model: {e}")
@@ -55,6 +107,96 @@ class VisionSystem:
         # Initialize camera
         self.initialize_camera()
     
+    def _ensure_openvino_model(self, model_path: str) -> str:
+        """
+        Return the OpenVINO IR directory for a .pt model, exporting it on first use
+        
+        Exports are cached next to the .pt file (<stem>_openvino_model/ and,
+        with OPENVINO_INT8, <stem>_int8_openvino_model/). Falls back to the
+        FP16 IR, then the .pt path, if an export fails (e.g. openvino missing).
+        """
+        pt_path = Path(model_path)
+        if pt_path.is_dir() or pt_path.suffix != '.pt':
+            return model_path  # Already an exported model
+        
+        ov_dir = self._export_openvino(pt_path, int8=False)
+        if ov_dir is None:
+            return model_path
+        
+        if OPENVINO_INT8:
+            int8_dir = self._export_openvino(pt_path, int8=True)
+            if int8_dir is not None and self._int8_accepted(int8_dir, ov_dir):
+                return int8_dir
+        
+        return ov_dir
+    
+    def _export_openvino(self, pt_path: Path, int8: bool) -> Optional[str]:
+        """Export (or reuse a cached export of) pt_path to OpenVINO IR"""
+        suffix = "_int8_openvino_model" if int8 else "_openvino_model"
+        ov_dir = pt_path.with_name(f"{pt_path.stem}{suffix}")
+        if ov_dir.is_dir():
+            return str(ov_dir)
+        
+        precision = "INT8" if int8 else "FP16"
+        try:
+            self.logger.info(f"Exporting {pt_path.name} to OpenVINO {precision} (one-time)...")
+            if int8:
+                exported = YOLO(str(pt_path)).export(format='openvino', int8=True, data=OPENVINO_INT8_DATA)
+            else:
+                exported = YOLO(str(pt_path)).export(format='openvino', half=True, int8=False)
+            self.logger.info(f"✓ OpenVINO {precision} model saved to {exported}")
+            return str(exported)
+        except Exception as e:
+            self.logger.warning(f"OpenVINO {precision} export failed: {e}")
+            return None
+    
+    def _int8_accepted(self, int8_dir: str, fp_dir: str) -> bool:
+        """
+        Compare INT8 and FP16 top-1 accuracy on OPENVINO_INT8_DATA
+        
+        The verdict is cached as a marker file in the INT8 export directory,
+        so the validation only runs once per export.
+        """
+        accepted_marker = Path(int8_dir) / "ACCEPTED"
+        rejected_marker = Path(int8_dir) / "REJECTED"
+        if accepted_marker.exists():
+            return True
+        if rejected_marker.exists():
+            return False
+        
+        try:
+            int8_top1 = float(YOLO(int8_dir, task='classify').val(data=OPENVINO_INT8_DATA, verbose=False).top1)
+            fp_top1 = float(YOLO(fp_dir, task='classify').val(data=OPENVINO_INT8_DATA, verbose=False).top1)
+        except Exception as e:
+            self.logger.warning(f"INT8 validation failed, using FP16 model: {e}")
+            return False
+        
+        accepted = int8_top1 >= fp_top1 - OPENVINO_INT8_MAX_DROP
+        (accepted_marker if accepted else rejected_marker).write_text(
+            f"int8 top1={int8_top1:.4f} fp16 top1={fp_top1:.4f}\n"
+        )
+        
+        if accepted:
+            self.logger.info(f"✓ INT8 model accepted (top-1 {int8_top1:.1%} vs FP16 {fp_top1:.1%})")
+        else:
+            self.logger.warning(f"INT8 model rejected (top-1 {int8_top1:.1%} vs FP16 {fp_top1:.1%}), using FP16")
+        return accepted
+    
+    def _infer(self, source, stream: bool = False):
+        """
+        Run the model on an image or list of images
+        
+        The first call goes through YOLO.__call__, which builds the
+        predictor (warmup() makes that the dummy inference); later calls
+        use the predictor directly, skipping the per-call argument merging.
+        """
+        if self._predictor is not None:
+            return self._predictor(source, stream=stream)
+        
+        results = self.model(source, verbose=False, stream=stream)
+        self._predictor = getattr(self.model, 'predictor', None)
+        return results
+    
     def get_model_input_size(self) -> int:
         """
         Detect and return model's expected input size
@@ -77,24 +219,33 @@ class VisionSystem:
                     self.logger.debug(f"Model input size from args: {size}")
                     return size
             
-            # Method 3: Try inference with test sizes and catch error
-            test_sizes = [224, 416, 640]
-            for size in test_sizes:
-                try:
-                    test_img = np.zeros((size, size, 3), dtype=np.uint8)
-                    self.model(test_img, verbose=False)
-                    self.logger.debug(f"Model input size detected via test: {size}")
+            # Method 3: Checkpoint training args (.pt files)
+            ckpt = getattr(self.model, 'ckpt', None)
+            if isinstance(ckpt, dict):
+                imgsz = (ckpt.get('train_args') or {}).get('imgsz', None)
+                if imgsz:
+                    size = imgsz if isinstance(imgsz, int) else imgsz[0]
+                    self.logger.debug(f"Model input size from checkpoint: {size}")
+                    return size
+            
+            # Method 4: metadata.yaml written next to exported models
+            model_dir = Path(str(getattr(self.model, 'ckpt_path', None) or getattr(self.model, 'model_name', '')))
+            metadata = model_dir / 'metadata.yaml'
+            if metadata.is_file():
+                import yaml
+                imgsz = (yaml.safe_load(metadata.read_text()) or {}).get('imgsz', None)
+                if imgsz:
+                    size = imgsz if isinstance(imgsz, int) else imgsz[0]
+                    self.logger.debug(f"Model input size from export metadata: {size}")
                     return size
-                except:
-                    continue
             
-            # Default fallback
-            self.logger.warning("Could not detect model input size, using default: 416")
-            return 416
+            # Default fallback (no test inference: each one costs seconds on the Pi)
+            self.logger.warning("Could not detect model input size, using default: 224")
+            return 224
             
         except Exception as e:
             self.logger.error(f"Error detecting model input size: {e}")
-            return 416  # Safe default
+            return 224  # Safe default
     
     def normalize_class_name(self, raw_name: str) -> str:
         """
@@ -119,7 +270,7 @@ class VisionSystem:
         # 'computer_keyboard' -> 'Computer Keyboard'
         normalized = raw_name.replace('_', ' ').title()
         
-        self.logger.debug(f"Class name normalized: '{raw_name}' -> '{normalized}'")
+        self.logger.debug("Class name normalized: '%s' -> '%s'", raw_name, normalized)
         return normalized
     
     def initialize_camera(self) -> bool:
@@ -145,15 +296,23 @@ class VisionSystem:
                 self.logger.error("Failed to open camera")
                 return False
             
+            # Try to set MJPEG for better performance (ignore if fails); V4L2
+            # only accepts a format change before the resolution is applied
+            try:
+                self.camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            except:
+                self.logger.debug("MJPEG format not supported, using default")
+            
             # Set resolution
             self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
             self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
             
-            # Try to set MJPEG for better performance (ignore if fails)
+            # Keep a single driver buffer so reads return the current frame
+            # rather than one queued several frames ago
             try:
-                self.camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+                self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             except:
-                self.logger.debug("MJPEG format not supported, using default")
+                self.logger.debug("Camera buffer size not configurable")
             
             # Try to disable auto settings (ignore if not supported)
             try:
@@ -180,29 +339,110 @@ class VisionSystem:
                 return False
             
             self.logger.info(f"✓ Camera initialized successfully - Frame size: {test_frame.shape}")
+            self._set_crop_slice(test_frame.shape[:2])
             return True
             
         except Exception as e:
             self.logger.error(f"✗ Camera initialization failed: {e}")
             return False
     
-    def capture_frame(self) -> Optional[np.ndarray]:
-        """Capture single frame from camera"""
+    def _start_reader(self):
+        """Start the background frame reader for the open camera"""
+        self._stop_reader()
+        # Fresh events per reader, so one still blocked in read() can't be revived
+        self._reader_stop = threading.Event()
+        self._reader_release = threading.Event()
+        self._reader = threading.Thread(
+            target=self._reader_loop,
+            args=(self.camera, self._reader_stop, self._reader_release),
+            name="camera-reader", daemon=True
+        )
+        self._reader.start()
+    
+    def _stop_reader(self, release: bool = False):
+        """
+        Stop the reader thread
+        
+        With release, the reader releases the camera itself once its
+        read() has returned, so the device is never released under it.
+        Waits up to a second for that; a reader still blocked after that
+        releases the camera when it finally exits.
+        """
+        if self._reader is not None:
+            if release:
+                self._reader_release.set()
+            self._reader_stop.set()
+            self._reader.join(timeout=1.0)
+            if self._reader.is_alive():
+                self.logger.warning("Camera reader still blocked in read(); it will release on exit")
+            self._reader = None
+        elif release and self.camera is not None:
+            self.camera.release()
+        self._frames.clear()
+        self._frame_ready.clear()
+    
+    def _reader_loop(self, camera, stop: threading.Event, release: threading.Event):
+        """Read frames continuously into the two-slot buffer"""
+        try:
+            while not stop.is_set():
+                try:
+                    ret, frame = camera.read()
+                except Exception as e:
+                    self.logger.error(f"Error capturing frame: {e}")
+                    ret, frame = False, None
+                
+                if ret and frame is not None:
+                    self._frames.append(frame)
+                    self._frame_ready.set()
+                else:
+                    stop.wait(0.05)
+        finally:
+            if release.is_set():
+                camera.release()
+    
+    def capture_frame(self, timeout: float = 1.0) -> Optional[np.ndarray]:
+        """
+        Return the newest frame the reader thread has captured
+        
+        Each frame is handed out once; if none has arrived since the last
+        call, waits up to timeout seconds for the next one.
+        """
+        if self.camera is None and self._camera_released:
+            self._camera_released = False
+            self.initialize_camera()
+        
         if self.camera is None or not self.camera.isOpened():
             self.logger.error("Camera not initialized")
             return None
         
-        try:
-            ret, frame = self.camera.read()
-            if not ret:
+        if self._reader is None:
+            self._start_reader()
+        
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self._frame_ready.wait(remaining):
                 self.logger.error("Failed to capture frame")
                 return None
             
+            self._frame_ready.clear()
+            try:
+                frame = self._frames.pop()
+            except IndexError:
+                continue  # Raced with the reader; its frame sets the event again
+            self._frames.clear()  # Anything older is stale
             return frame
-            
-        except Exception as e:
-            self.logger.error(f"Error capturing frame: {e}")
-            return None
+    
+    def _set_crop_slice(self, shape: Tuple[int, int], crop_percent: float = CROP_PERCENTAGE):
+        """Precompute the center-crop slices for frames of the given (height, width)"""
+        height, width = shape
+        crop_width = int(width * crop_percent)
+        crop_height = int(height * crop_percent)
+        start_x = (width - crop_width) // 2
+        start_y = (height - crop_height) // 2
+        
+        self._crop_shape = (height, width)
+        self._crop_slice = (slice(start_y, start_y + crop_height), slice(start_x, start_x + crop_width))
     
     def crop_center(self, frame: np.ndarray, crop_percent: float = CROP_PERCENTAGE) -> np.ndarray:
         """Crop center region of frame"""
@@ -217,10 +457,17 @@ class VisionSystem:
         cropped = frame[start_y:start_y+crop_height, start_x:start_x+crop_width]
         return cropped
     
-    def classify_item(self, frame: Optional[np.ndarray] = None) -> Dict:
+    def classify_item(self, frame: Optional[np.ndarray] = None, return_all: bool = False) -> Dict:
         """
         Classify item in frame
         
+        Args:
+            frame: BGR frame to classify. Callers that already own a frame
+                (e.g. a capture thread) should pass it in; only when omitted
+                is a new frame read from the camera.
+            return_all: Fill 'all_predictions' (left empty otherwise, since
+                only diagnostic screens show it)
+        
         Returns:
             {
                 'success': bool,
@@ -250,14 +497,11 @@ class VisionSystem:
             }
         
         try:
-            # Crop center region
-            cropped = self.crop_center(frame, CROP_PERCENTAGE)
-            
-            # CRITICAL: Resize to exact model input size
-            resized = cv2.resize(cropped, (self.input_size, self.input_size))
+            # Crop center region and (CRITICAL) resize to exact model input size
+            resized = self._preprocess(frame, dst=self._resize_buf)
             
             # Run classification
-            results = self.model(resized, verbose=False)
+            results = self._infer(resized)
             
             # Extract predictions
             if len(results) == 0:
@@ -269,76 +513,140 @@ class VisionSystem:
                     'error': 'No results from model'
                 }
             
-            result = results[0]
+            return self._build_result(results[0], return_all)
             
-            # Get predicted class and confidence
-            if hasattr(result, 'probs') and result.probs is not None:
-                probs = result.probs
-                top_class_idx = int(probs.top1)
-                confidence = float(probs.top1conf)
-                
-                # Get class name from model
-                class_names = result.names
-                raw_class_name = class_names[top_class_idx]
-                
-                # Normalize class name to match ITEM_CLASSES format
-                predicted_class = self.normalize_class_name(raw_class_name)
-                
-                # Get all predictions for debugging (with normalized names)
-                all_preds = {}
-                if hasattr(probs, 'data'):
-                    for idx, prob in enumerate(probs.data):
-                        normalized_name = self.normalize_class_name(class_names[idx])
-                        all_preds[normalized_name] = float(prob)
-                
-                # Check confidence threshold
-                if confidence < CONFIDENCE_THRESHOLD:
-                    return {
-                        'success': False,
-                        'class_name': predicted_class,
-                        'confidence': confidence,
-                        'all_predictions': all_preds,
-                        'error': f'Confidence too low: {confidence:.2%} < {CONFIDENCE_THRESHOLD:.2%}'
-                    }
-                
-                # Validate class is in ITEM_CLASSES
-                if predicted_class not in ITEM_CLASSES:
-                    return {
-                        'success': False,
-                        'class_name': predicted_class,
-                        'confidence': confidence,
-                        'all_predictions': all_preds,
-                        'error': f'Detected class not in system: {predicted_class} (raw: {raw_class_name})'
-                    }
-                
-                # Success!
-                self.logger.debug(f"Classification: {predicted_class} ({confidence:.2%})")
+        except Exception as e:
+            self.logger.error(f"Classification error: {e}")
+            return {
+                'success': False,
+                'class_name': None,
+                'confidence': 0.0,
+                'all_predictions': {},
+                'error': str(e)
+            }
+    
+    def _preprocess(self, frame: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Crop center region and resize to the exact model input size
+        
+        When dst is given the result is written into it (and returned);
+        INTER_AREA is both cheaper and cleaner than bilinear for downscaling.
+        With USE_OPENCL the resize runs on the OpenCL device instead.
+        """
+        if frame.shape[:2] == self._crop_shape:
+            cropped = frame[self._crop_slice]
+        else:
+            cropped = self.crop_center(frame, CROP_PERCENTAGE)  # Frame not from the camera
+        
+        if self._use_opencl:
+            # The result is downloaded back to an ndarray for the model, so dst is unused
+            resized = cv2.resize(cv2.UMat(cropped), (self.input_size, self.input_size),
+                                 interpolation=cv2.INTER_AREA)
+            return resized.get()
+        
+        return cv2.resize(cropped, (self.input_size, self.input_size),
+                          dst=dst, interpolation=cv2.INTER_AREA)
+    
+    def _build_result(self, result, return_all: bool = False) -> Dict:
+        """Turn one ultralytics result into the classify_item result dict"""
+        # Get predicted class and confidence
+        if hasattr(result, 'probs') and result.probs is not None:
+            probs = result.probs
+            top_class_idx = int(probs.top1)
+            confidence = float(probs.top1conf)
+            
+            # Get class name from model, normalized to match ITEM_CLASSES format
+            class_names = result.names
+            raw_class_name = class_names[top_class_idx]
+            predicted_class = self._name_table[top_class_idx]
+            
+            # Get all predictions for debugging (with normalized names)
+            # (one bulk tolist() instead of a float() per class)
+            all_preds = {}
+            if return_all and hasattr(probs, 'data'):
+                name_table = self._name_table
+                all_preds = {name_table[idx]: prob for idx, prob in enumerate(probs.data.tolist())}
+            
+            # Check confidence threshold
+            if confidence < CONFIDENCE_THRESHOLD:
                 return {
-                    'success': True,
+                    'success': False,
                     'class_name': predicted_class,
                     'confidence': confidence,
-                    'all_predictions': all_preds
+                    'all_predictions': all_preds,
+                    'error': f'Confidence too low: {confidence:.2%} < {CONFIDENCE_THRESHOLD:.2%}'
                 }
             
-            else:
+            # Validate class is in ITEM_CLASSES
+            if predicted_class not in self._item_class_set:
                 return {
                     'success': False,
-                    'class_name': None,
-                    'confidence': 0.0,
-                    'all_predictions': {},
-                    'error': 'Model did not return probabilities'
+                    'class_name': predicted_class,
+                    'confidence': confidence,
+                    'all_predictions': all_preds,
+                    'error': f'Detected class not in system: {predicted_class} (raw: {raw_class_name})'
                 }
-                
-        except Exception as e:
-            self.logger.error(f"Classification error: {e}")
+            
+            # Success!
+            self.logger.debug("Classification: %s (%.2f%%)", predicted_class, confidence * 100)
+            return {
+                'success': True,
+                'class_name': predicted_class,
+                'confidence': confidence,
+                'all_predictions': all_preds
+            }
+        
+        else:
             return {
                 'success': False,
                 'class_name': None,
                 'confidence': 0.0,
                 'all_predictions': {},
-                'error': str(e)
+                'error': 'Model did not return probabilities'
             }
     
+    def classify_batch(self, frames: List[np.ndarray], return_all: bool = False) -> List[Dict]:
+        """
+        Classify several frames in a single model call
+        
+        Args:
+            frames: BGR frames to classify
+            return_all: Fill 'all_predictions' in each result
+        
+        Returns:
+            One classify_item-style result dict per frame, in order
+        """
+        if not frames:
+            return []
+        
+        try:
+            batch = [self._preprocess(frame) for frame in frames]
+            results = self._infer(batch, stream=True)
+            return [self._build_result(result, return_all) for result in results]
+        
+        except Exception as e:
+            self.logger.error(f"Batch classification error: {e}")
+            return [{
+                'success': False,
+                'class_name': None,
+                'confidence': 0.0,
+                'all_predictions': {},
+                'error': str(e)
+            } for _ in frames]
+    
+    def warmup(self):
+        """
+        Run one dummy classification so the first real one does not pay
+        the backend's lazy initialisation / kernel setup cost; this is also
+        the call that builds the reused predictor
+        """
+        try:
+            dummy = np.zeros((CAMERA_HEIGHT, CAMERA_WIDTH, 3), dtype=np.uint8)
+            self.classify_item(dummy)
+            self.logger.debug("Model warm-up inference complete")
+        except Exception as e:
+            self.logger.warning(f"Model warm-up failed: {e}")
+    
     def get_live_feed(self) -> Optional[np.ndarray]:
         """
         Return current frame for GUI display
@@ -346,13 +654,25 @@ class VisionSystem:
         """
         return self.capture_frame()
     
+    def release_camera(self):
+        """
+        Release the camera device (and its driver buffers) while the
+        vision system stays loaded; the next capture_frame() reopens it
+        """
+        if self.camera is not None:
+            self._stop_reader(release=True)
+            self.camera = None
+            self._camera_released = True
+            self.logger.info("Camera released (will reopen on next capture)")
+    
     def cleanup(self):
         """Release camera resources"""
         if self.camera is not None:
-            self.camera.release()
+            self._stop_reader(release=True)
             self.logger.info("Camera released")
         
         self.camera = None
+        self._camera_released = False
     
     def __del__(self):
         """Ensure cleanup on deletion"""
@@ -7,14 +7,30 @@ Usage:
     python test_camera.py
     python test_camera.py --camera 0  # Use camera ID 0
     python test_camera.py --no-classify  # Just show camera feed without classification
+    python test_camera.py --batch 4  # Continuous mode classifies 4 frames per model call
+    python test_camera.py --process  # Continuous mode runs inference in a separate process
 """
 
 import cv2
 import argparse
+import glob
+import multiprocessing as mp
+import queue
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
 
-def test_camera_feed(camera_id=1, show_classification=True, model_path='models/fine-tunedmodel.pt'):
+import numpy as np
+
+# Model input size used by preprocess_frame
+INPUT_SIZE = 224
+
+# Overlay font (looked up once rather than per putText call)
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+def test_camera_feed(camera_id=1, show_classification=True, model_path='models/fine-tunedmodel.pt',
+                     batch_size=1, use_process=False):
     """
     Test camera feed with optional classification
     
@@ -29,6 +45,8 @@ def test_camera_feed(camera_id=1, show_classification=True, model_path='models/f
     print(f"{'='*50}")
     print(f"Camera ID: {camera_id}")
     print(f"Classification: {'Enabled' if show_classification else 'Disabled'}")
+    print(f"Batch size: {batch_size}")
+    print(f"Inference process: {'Yes' if use_process else 'No'}")
     print(f"{'='*50}\n")
     
     # Initialize camera
@@ -43,13 +61,19 @@ def test_camera_feed(camera_id=1, show_classification=True, model_path='models/f
         print(f"ERROR: Could not open camera {camera_id}")
         return False
     
+    # Try MJPEG format (before the resolution; V4L2 rejects later format changes)
+    try:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    except:
+        pass
+    
     # Set resolution
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
     
-    # Try MJPEG format
+    # Single driver buffer so each read is the latest frame
     try:
-        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
     except:
         pass
     
@@ -95,6 +119,27 @@ def test_camera_feed(camera_id=1, show_classification=True, model_path='models/f
     frame_count = 0
     fps_start = time.time()
     fps = 0
+    fps_text = "FPS: 0.0"  # Only re-formatted when fps is recalculated
+    
+    # Continuous mode runs inference on a worker so the next frame is
+    # captured while the previous one is classified
+    executor = ThreadPoolExecutor(max_workers=1)
+    pending = None
+    result = None
+    overlay_result = None  # The result overlay_text/overlay_color were built from
+    overlay_text, overlay_color = "", (0, 255, 0)
+    batch = []  # Preprocessed frames waiting for the next batched call
+    infer_time = 0.0  # Duration of the last model call, sets the batch frame stride
+    submitted_at = 0.0
+    
+    # With use_process, continuous mode hands frames to an inference process
+    # instead: frames are resized straight into shared memory (no pickling or
+    # pipe copies) and only small result dicts come back through a queue
+    worker = None
+    if use_process and model is not None:
+        worker = InferenceProcess(model_path, batch_size)
+    save_next = False
+    classify_next = False
     
     try:
         while True:
@@ -109,28 +154,75 @@ def test_camera_feed(camera_id=1, show_classification=True, model_path='models/f
             if frame_count % 30 == 0:
                 fps = 30 / (time.time() - fps_start)
                 fps_start = time.time()
+                fps_text = f"FPS: {fps:.1f}"
             
-            # Create display frame
-            display = frame.copy()
-            
-            # Add FPS overlay
-            cv2.putText(display, f"FPS: {fps:.1f}", (10, 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            # Raw-frame actions requested by the previous key press run before
+            # any overlay is drawn, since the overlay goes onto the frame itself
+            if save_next:
+                save_next = False
+                filename = f"capture_{int(time.time())}.jpg"
+                cv2.imwrite(filename, frame)
+                print(f"✓ Frame saved to {filename}")
             
-            # Continuous classification
-            if continuous_classify and model is not None:
-                result = classify_frame(model, frame)
+            if classify_next:
+                classify_next = False
+                print("\n--- Single Classification ---")
+                # Same executor as continuous mode: the model isn't thread-safe,
+                # so this queues behind any in-flight inference instead of racing it
+                result = executor.submit(classify_frame, model, frame, True).result()
                 if result:
-                    # Draw classification result
-                    text = f"{result['class']}: {result['confidence']:.1%}"
-                    color = (0, 255, 0) if result['confidence'] > 0.8 else (0, 165, 255)
-                    cv2.putText(display, text, (10, 60),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-                    cv2.putText(display, "[CONTINUOUS]", (10, 90),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+                    print(f"Detected: {result['class']} ({result['confidence']:.1%})")
+                print("----------------------------\n")
+            
+            # Continuous classification (shows the latest finished result);
+            # frames are preprocessed here, so the worker never sees the overlay
+            if continuous_classify and model is not None and worker is not None:
+                latest = worker.poll()
+                if latest is not InferenceProcess.NO_RESULT:
+                    result = latest
+                worker.add_frame(frame)  # Ignored while the worker is busy
+            
+            elif continuous_classify and model is not None:
+                if pending is not None and pending.done():
+                    result = pending.result()
+                    pending = None
+                    infer_time = time.time() - submitted_at
+                
+                if batch_size > 1:
+                    # Spread the batch over one inference period: only every
+                    # Nth frame is preprocessed, the rest are just displayed
+                    stride = max(1, round(infer_time * fps / batch_size))
+                    if frame_count % stride == 0:
+                        batch.append(preprocess_frame(frame))
+                    if len(batch) >= batch_size and pending is None:
+                        pending = executor.submit(classify_batch, model, batch)
+                        submitted_at = time.time()
+                        batch = []
+                    elif len(batch) > batch_size:
+                        batch.pop(0)  # Previous batch still running; keep the newest frames
+                elif pending is None:
+                    # The worker is free, so this is the freshest frame it can get;
+                    # frames captured while it is busy are only displayed
+                    pending = executor.submit(classify_batch, model, [preprocess_frame(frame)])
+                    submitted_at = time.time()
+            
+            # Add FPS overlay (drawn directly on the frame; no display copy)
+            cv2.putText(frame, fps_text, (10, 30), 
+                       FONT, 0.7, (0, 255, 0), 2)
+            
+            if continuous_classify and result:
+                # Draw classification result (text rebuilt only for a new result)
+                if result is not overlay_result:
+                    overlay_result = result
+                    overlay_text = f"{result['class']}: {result['confidence']:.1%}"
+                    overlay_color = (0, 255, 0) if result['confidence'] > 0.8 else (0, 165, 255)
+                cv2.putText(frame, overlay_text, (10, 60),
+                           FONT, 0.7, overlay_color, 2)
+                cv2.putText(frame, "[CONTINUOUS]", (10, 90),
+                           FONT, 0.5, (255, 255, 0), 1)
             
             # Show frame
-            cv2.imshow("Camera Test", display)
+            cv2.imshow("Camera Test", frame)
             
             # Handle key presses
             key = cv2.waitKey(1) & 0xFF
@@ -140,19 +232,14 @@ def test_camera_feed(camera_id=1, show_classification=True, model_path='models/f
                 break
             
             elif key == ord('c') and model is not None:
-                print("\n--- Single Classification ---")
-                result = classify_frame(model, frame, verbose=True)
-                if result:
-                    print(f"Detected: {result['class']} ({result['confidence']:.1%})")
-                print("----------------------------\n")
+                classify_next = True  # Classify the next (clean) frame
             
             elif key == ord('s'):
-                filename = f"capture_{int(time.time())}.jpg"
-                cv2.imwrite(filename, frame)
-                print(f"✓ Frame saved to {filename}")
+                save_next = True  # Save the next (clean) frame
             
             elif key == ord('r'):
                 continuous_classify = not continuous_classify
+                result = None
                 status = "ON" if continuous_classify else "OFF"
                 print(f"Continuous classification: {status}")
             
@@ -170,6 +257,9 @@ def test_camera_feed(camera_id=1, show_classification=True, model_path='models/f
         print("\nInterrupted by user")
     
     finally:
+        executor.shutdown(wait=True)
+        if worker is not None:
+            worker.close()
         cap.release()
         cv2.destroyAllWindows()
         print("Camera released")
@@ -177,6 +267,122 @@ def test_camera_feed(camera_id=1, show_classification=True, model_path='models/f
     return True
 
 
+def preprocess_frame(frame, dst=None):
+    """Crop center 70% and resize for the model (into dst if given)"""
+    h, w = frame.shape[:2]
+    crop_pct = 0.7
+    crop_w, crop_h = int(w * crop_pct), int(h * crop_pct)
+    start_x, start_y = (w - crop_w) // 2, (h - crop_h) // 2
+    cropped = frame[start_y:start_y+crop_h, start_x:start_x+crop_w]
+    
+    return cv2.resize(cropped, (INPUT_SIZE, INPUT_SIZE), dst=dst)
+
+
+class InferenceProcess:
+    """
+    Continuous classification in a separate process
+    
+    Frames are preprocessed directly into a shared-memory block of
+    batch_size slots; when every slot is filled the worker is signalled,
+    classifies the block and sends back the parse_result dict for the
+    newest frame. Slots are only written while the worker is idle, so the
+    two processes never touch the block at the same time.
+    """
+    
+    NO_RESULT = object()  # poll() result when no batch has finished since the last call
+    
+    def __init__(self, model_path, batch_size=1):
+        shape = (batch_size, INPUT_SIZE, INPUT_SIZE, 3)
+        self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        self._frames = np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._slot = 0
+        self._busy = False
+        
+        # spawn: a forked child would inherit the camera and GUI state
+        ctx = mp.get_context('spawn')
+        self._frame_ready = ctx.Event()
+        self._stop = ctx.Event()
+        self._results = ctx.Queue()
+        self._process = ctx.Process(
+            target=inference_worker,
+            args=(model_path, self._shm.name, shape, self._frame_ready, self._results, self._stop),
+            daemon=True
+        )
+        self._process.start()
+    
+    def add_frame(self, frame):
+        """Preprocess frame into the next free slot; signal the worker when full"""
+        if self._busy:
+            return
+        
+        preprocess_frame(frame, dst=self._frames[self._slot])
+        self._slot += 1
+        if self._slot == len(self._frames):
+            self._slot = 0
+            self._busy = True
+            self._frame_ready.set()
+    
+    def poll(self):
+        """Return the finished batch's result (may be None), or NO_RESULT"""
+        if not self._busy:
+            return self.NO_RESULT
+        try:
+            result = self._results.get_nowait()
+        except queue.Empty:
+            return self.NO_RESULT
+        self._busy = False
+        return result
+    
+    def close(self):
+        """Stop the worker and free the shared memory"""
+        self._stop.set()
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+        
+        del self._frames  # Release the view before closing the mapping
+        self._shm.close()
+        self._shm.unlink()
+
+
+def inference_worker(model_path, shm_name, shape, frame_ready, results, stop):
+    """Inference process body: classify the shared block each time it is signalled"""
+    from ultralytics import YOLO
+    
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        frames = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        model = YOLO(model_path)
+        
+        while not stop.is_set():
+            if not frame_ready.wait(0.1):
+                continue
+            frame_ready.clear()
+            results.put(classify_batch(model, frames))
+        
+        del frames
+    except KeyboardInterrupt:
+        pass
+    finally:
+        shm.close()
+
+
+def classify_batch(model, frames):
+    """
+    Classify several preprocessed frames in one model call
+    
+    Frames are passed as a Python list so ultralytics treats them as a
+    batch. Returns the result for the newest frame (or None).
+    """
+    try:
+        results = model(list(frames), verbose=False)
+        if len(results) == 0:
+            return None
+        return parse_result(results[-1])
+    except Exception:
+        return None
+
+
 def classify_frame(model, frame, verbose=False):
     """
     Classify a single frame
@@ -186,15 +392,8 @@ def classify_frame(model, frame, verbose=False):
         or None if failed
     """
     try:
-        # Crop center 70%
-        h, w = frame.shape[:2]
-        crop_pct = 0.7
-        crop_w, crop_h = int(w * crop_pct), int(h * crop_pct)
-        start_x, start_y = (w - crop_w) // 2, (h - crop_h) // 2
-        cropped = frame[start_y:start_y+crop_h, start_x:start_x+crop_w]
-        
-        # Resize for model
-        resized = cv2.resize(cropped, (224, 224))
+        # Crop center 70% and resize for model
+        resized = preprocess_frame(frame)
         
         # Run inference
         results = model(resized, verbose=False)
@@ -202,33 +401,7 @@ def classify_frame(model, frame, verbose=False):
         if len(results) == 0:
             return None
         
-        result = results[0]
-        
-        if hasattr(result, 'probs') and result.probs is not None:
-            probs = result.probs
-            top_idx = int(probs.top1)
-            confidence = float(probs.top1conf)
-            class_name = result.names[top_idx]
-            
-            # Get all predictions
-            all_preds = {}
-            if hasattr(probs, 'data'):
-                for idx, prob in enumerate(probs.data):
-                    all_preds[result.names[idx]] = float(prob)
-            
-            if verbose:
-                print("\nAll predictions:")
-                for name, conf in sorted(all_preds.items(), key=lambda x: x[1], reverse=True):
-                    bar = "█" * int(conf * 20)
-                    print(f"  {name:20s} {conf:6.1%} {bar}")
-            
-            return {
-                'class': class_name,
-                'confidence': confidence,
-                'all_predictions': all_preds
-            }
-        
-        return None
+        return parse_result(results[0], verbose)
     
     except Exception as e:
         if verbose:
@@ -236,12 +409,56 @@ def classify_frame(model, frame, verbose=False):
         return None
 
 
+def parse_result(result, verbose=False):
+    """Turn one ultralytics result into a result dict (or None)"""
+    if hasattr(result, 'probs') and result.probs is not None:
+        probs = result.probs
+        top_idx = int(probs.top1)
+        confidence = float(probs.top1conf)
+        class_name = result.names[top_idx]
+        
+        # Get all predictions (only printed when verbose, so skipped otherwise)
+        all_preds = {}
+        if verbose and hasattr(probs, 'data'):
+            names = result.names
+            all_preds = {names[idx]: prob for idx, prob in enumerate(probs.data.tolist())}
+        
+        if verbose:
+            print("\nAll predictions:")
+            for name, conf in sorted(all_preds.items(), key=lambda x: x[1], reverse=True):
+                bar = "█" * int(conf * 20)
+                print(f"  {name:20s} {conf:6.1%} {bar}")
+        
+        return {
+            'class': class_name,
+            'confidence': confidence,
+            'all_predictions': all_preds
+        }
+    
+    return None
+
+
+def video_device_ids():
+    """
+    IDs of the /dev/videoN nodes that exist, so only those are opened
+    
+    Falls back to probing 0-9 where there are no /dev/video* nodes (non-Linux).
+    """
+    ids = []
+    for path in glob.glob('/dev/video*'):
+        suffix = path.rsplit('video', 1)[1]
+        if suffix.isdigit():
+            ids.append(int(suffix))
+    
+    return sorted(ids) if ids else list(range(10))
+
+
 def list_cameras():
     """List available cameras"""
     print("\nScanning for cameras...")
     available = []
     
-    for i in range(10):
+    for i in video_device_ids():
         cap = cv2.VideoCapture(i)
         if cap.isOpened():
             ret, _ = cap.read()
@@ -266,6 +483,10 @@ if __name__ == "__main__":
                        help="Path to YOLO model")
     parser.add_argument("--list", "-l", action="store_true",
                        help="List available cameras and exit")
+    parser.add_argument("--batch", "-b", type=int, default=1,
+                       help="Frames per model call in continuous mode (default: 1)")
+    parser.add_argument("--process", "-p", action="store_true",
+                       help="Run continuous classification in a separate process (shared-memory frames)")
     
     args = parser.parse_args()
     
@@ -276,7 +497,9 @@ if __name__ == "__main__":
     success = test_camera_feed(
         camera_id=args.camera,
         show_classification=not args.no_classify,
-        model_path=args.model
+        model_path=args.model,
+        batch_size=max(1, args.batch),
+        use_process=args.process
     )
     
     sys.exit(0 if success else 1)
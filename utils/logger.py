@@ -2,11 +2,21 @@
 Centralized logging system for Office Items Loan Robot
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
 
+# Components may be constructed concurrently during startup
+_setup_lock = threading.Lock()
+
+# Background thread that writes queued records to the console/file handlers
+_listener = None
+
 class RobotLogger:
     """
     Unified logging system for all operations
@@ -14,51 +24,66 @@ class RobotLogger:
     Logs to:
     - Console (INFO and above)
     - File (DEBUG and above)
+    
+    Callers only enqueue records; a QueueListener thread does the actual
+    console/file writes, so a slow SD card never stalls the calling thread.
+    
+    Methods take logging-style lazy arguments, e.g.
+    logger.debug("Moved to %s", angles), so the message is only formatted
+    if the record is actually emitted.
+    
+    Every instance shares the one 'OfficeRobot' logger; its handlers are
+    configured by the first instance and reused by later ones.
     """
     
     def __init__(self, log_file='robot.log', console_level='INFO', file_level='DEBUG'):
         """Setup logging configuration"""
         self.logger = logging.getLogger('OfficeRobot')
-        self.logger.setLevel(logging.DEBUG)
-        
-        # Remove existing handlers to avoid duplicates
-        self.logger.handlers = []
         
-        # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(getattr(logging, console_level))
-        console_format = logging.Formatter(
-            '%(levelname)s: %(message)s'
-        )
-        console_handler.setFormatter(console_format)
-        self.logger.addHandler(console_handler)
+        # Logging methods are the logging.Logger's own bound methods, so a
+        # call costs no extra wrapper frame (info, warning, error, debug
+        # (file only), critical, isEnabledFor)
+        self.info = self.logger.info
+        self.warning = self.logger.warning
+        self.error = self.logger.error
+        self.debug = self.logger.debug
+        self.critical = self.logger.critical
+        self.isEnabledFor = self.logger.isEnabledFor
         
-        # File handler
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(getattr(logging, file_level))
-        file_format = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        file_handler.setFormatter(file_format)
-        self.logger.addHandler(file_handler)
-    
-    def info(self, message):
-        """Log informational message"""
-        self.logger.info(message)
-    
-    def warning(self, message):
-        """Log warning message"""
-        self.logger.warning(message)
-    
-    def error(self, message):
-        """Log error message"""
-        self.logger.error(message)
-    
-    def debug(self, message):
-        """Log debug message (file only)"""
-        self.logger.debug(message)
-    
-    def critical(self, message):
-        """Log critical message"""
-        self.logger.critical(message)
+        with _setup_lock:
+            # Already configured by an earlier instance; re-adding handlers
+            # would open another file descriptor for the log file
+            if self.logger.handlers:
+                return
+            
+            # Logger level is the most verbose handler level, so isEnabledFor()
+            # reports whether a record would actually reach any handler
+            self.logger.setLevel(min(getattr(logging, console_level), getattr(logging, file_level)))
+            
+            # Console handler
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setLevel(getattr(logging, console_level))
+            console_format = logging.Formatter(
+                '%(levelname)s: %(message)s'
+            )
+            console_handler.setFormatter(console_format)
+            
+            # File handler
+            file_handler = logging.FileHandler(log_file)
+            file_handler.setLevel(getattr(logging, file_level))
+            file_format = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+            file_handler.setFormatter(file_format)
+            
+            # Route records through a queue to a listener thread; the listener
+            # still applies each handler's own level
+            global _listener
+            log_queue = queue.Queue(-1)
+            self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+            _listener = logging.handlers.QueueListener(
+                log_queue, console_handler, file_handler, respect_handler_level=True
+            )
+            _listener.start()
+            atexit.register(_listener.stop)  # Flush pending records on exit